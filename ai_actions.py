@@ -1,6 +1,8 @@
 import os
 import json
-from typing import List, Dict, Any, Optional, Tuple
+import fastjson
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Set, Tuple
 from difflib import get_close_matches
 from openai import OpenAI
 from ai_prompts import (
@@ -12,6 +14,12 @@ from ai_prompts import (
 )
 from ai_tools import AVAILABLE_TOOLS
 
+# Number of recent permission/data-action decisions remembered, keyed by input and game state
+AI_DECISION_CACHE_SIZE = 128
+
+# Inputs judged invalid in past sessions, one per line; rejected without an AI call
+INVALID_INPUTS_PATH = os.path.join(os.path.dirname(__file__), "invalid_inputs.txt")
+
 
 class AIActionHandler:
     def __init__(self):
@@ -20,7 +28,39 @@ class AIActionHandler:
         if self.api_key:
             self.client = OpenAI(api_key=self.api_key)
         self.available_actions = []
+        # Inputs previously judged invalid, loaded from invalid_inputs.txt on first use
+        self._invalid_inputs: Optional[Set[str]] = None
+        # Recent AI decisions keyed by (kind, normalized input, game state) so repeated inputs skip the API
+        self._decision_cache: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
         
+    def _decision_key(self, kind: str, user_input: str, game_state: Dict[str, Any]) -> Tuple[str, str, str]:
+        """Build the cache key for an AI decision about this input in this game state"""
+        return (kind, user_input.strip().lower(), json.dumps(game_state, sort_keys=True, default=str))
+    
+    def _cached_decision(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        """Return a remembered decision, marking it as recently used"""
+        decision = self._decision_cache.get(key)
+        if decision is not None:
+            self._decision_cache.move_to_end(key)
+        return decision
+    
+    def _remember_decision(self, key: Tuple[str, str, str], decision: Dict[str, Any]):
+        """Remember an AI decision, evicting the least recently used one when full"""
+        self._decision_cache[key] = decision
+        if len(self._decision_cache) > AI_DECISION_CACHE_SIZE:
+            self._decision_cache.popitem(last=False)
+    
+    def is_known_invalid(self, user_input: str) -> bool:
+        """Whether this input was already judged invalid, so no AI call is needed to reject it"""
+        # Load invalid inputs from file once; later denials are added to the set as they are written
+        if self._invalid_inputs is None:
+            try:
+                with open(INVALID_INPUTS_PATH, "r") as f:
+                    self._invalid_inputs = set(line.strip().lower() for line in f if line.strip())
+            except Exception:
+                self._invalid_inputs = set()
+        return user_input.strip().lower() in self._invalid_inputs
+    
     def set_available_actions(self, actions: List[str]):
         """Set the list of available actions for autocorrect and suggestions"""
         self.available_actions = actions
@@ -38,15 +78,8 @@ class AIActionHandler:
 
         # automated sanitation based on past commands judged to be "invalid"
         cleaned = user_input.strip().lower()
-        # Load invalid inputs from file
-        invalid_path = os.path.join(os.path.dirname(__file__), "invalid_inputs.txt")
-        try:
-            with open(invalid_path, "r") as f:
-                invalid_inputs = set(line.strip().lower() for line in f if line.strip())
-        except Exception:
-            invalid_inputs = set()
         # Reject if input is in invalid_inputs
-        if cleaned in invalid_inputs:
+        if self.is_known_invalid(user_input):
             return {
                 "allowed": False,
                 "reasoning": "Input is not a valid or comprehensible action. Please enter a meaningful command.",
@@ -60,6 +93,11 @@ class AIActionHandler:
                 "restricted_effects": []
             }
         
+        key = self._decision_key("permission", user_input, game_state)
+        cached = self._cached_decision(key)
+        if cached is not None:
+            return cached
+        
         # 
         try:
             message = get_permission_check_message(user_input, game_state)
@@ -77,22 +115,25 @@ class AIActionHandler:
             
             # Extract tool call response
             tool_call = response.choices[0].message.tool_calls[0]
-            permission_data = json.loads(tool_call.function.arguments)
+            permission_data = fastjson.loads(tool_call.function.arguments)
             
             allowed = bool(permission_data.get("allowed", True))
             reasoning = permission_data.get("reasoning", "No reasoning provided")
             # If OpenAI returns a non-specific denial, add to invalid_inputs.txt
             if not allowed and ("not a valid" in reasoning or "not comprehensible" in reasoning or "unclear" in reasoning or "meaningful" in reasoning):
+                self._invalid_inputs.add(cleaned)
                 try:
-                    with open(invalid_path, "a") as f:
+                    with open(INVALID_INPUTS_PATH, "a") as f:
                         f.write(f"{cleaned}\n")
                 except Exception:
                     pass
-            return {
+            permission = {
                 "allowed": allowed,
                 "reasoning": reasoning,
                 "restricted_effects": permission_data.get("restricted_effects", [])
             }
+            self._remember_decision(key, permission)
+            return permission
                 
         except Exception as e:
             print(f"Error in permission check: {e}")
@@ -120,6 +161,11 @@ class AIActionHandler:
                 "confidence": 0.5
             }
         
+        key = self._decision_key("data_action", user_input, game_state)
+        cached = self._cached_decision(key)
+        if cached is not None:
+            return cached
+        
         try:
             # Create the data action determination message
             message = get_data_action_message(user_input, game_state)
@@ -138,14 +184,16 @@ class AIActionHandler:
             
             # Extract tool call response
             tool_call = response.choices[0].message.tool_calls[0]
-            data_action = json.loads(tool_call.function.arguments)
+            data_action = fastjson.loads(tool_call.function.arguments)
             
-            return {
+            decision = {
                 "action_type": data_action.get("action_type", "immediate"),
                 "data_type": data_action.get("data_type", "none"),
                 "reasoning": data_action.get("reasoning", "No reasoning provided"),
                 "confidence": float(data_action.get("confidence", 0.5))
             }
+            self._remember_decision(key, decision)
+            return decision
                 
         except Exception as e:
             print(f"Error in data action determination: {e}")
@@ -192,7 +240,7 @@ class AIActionHandler:
             
             # Extract tool call response
             tool_call = response.choices[0].message.tool_calls[0]
-            primitive_data = json.loads(tool_call.function.arguments)
+            primitive_data = fastjson.loads(tool_call.function.arguments)
             
             return {
                 "use_specific_primitive": bool(primitive_data.get("use_specific_primitive", False)),
@@ -262,7 +310,7 @@ class AIActionHandler:
             
             # Extract tool call response
             tool_call = response.choices[0].message.tool_calls[0]
-            function_args = json.loads(tool_call.function.arguments)
+            function_args = fastjson.loads(tool_call.function.arguments)
             
             # Return the strategy decision
             return {
@@ -321,7 +369,7 @@ class AIActionHandler:
             
             # Extract tool call response
             tool_call = response.choices[0].message.tool_calls[0]
-            suggestion_data = json.loads(tool_call.function.arguments)
+            suggestion_data = fastjson.loads(tool_call.function.arguments)
             
             # Return a simple response encouraging dynamic action creation
             return {
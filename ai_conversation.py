@@ -4,11 +4,10 @@ Manages hybrid conversation system with pre-set and dynamic conversations.
 """
 
 import os
-import json
+import fastjson
 from typing import Dict, Any
-from datetime import datetime
 from openai import OpenAI
-from game_types import NPC, ConversationNode, DynamicExchange, ConversationState
+from game_types import NPC, ConversationNode, DynamicExchange, ConversationState, TICK_CLOCK
 from ai_prompts import get_conversation_analysis_message, get_dynamic_response_message
 
 
@@ -73,7 +72,7 @@ class AIConversationHandler:
             
             # Extract tool call response
             tool_call = response.choices[0].message.tool_calls[0]
-            analysis_data = json.loads(tool_call.function.arguments)
+            analysis_data = fastjson.loads(tool_call.function.arguments)
             
             return {
                 "strategy": analysis_data.get("strategy", "dynamic"),
@@ -172,7 +171,7 @@ class AIConversationHandler:
         conversation_state.max_questions_remaining = max(0, conversation_state.max_questions_remaining - 1)
         
         # Update last interaction
-        conversation_state.last_interaction = datetime.now().isoformat()
+        conversation_state.last_interaction = TICK_CLOCK.iso()
         
         return conversation_state
 
@@ -1,11 +1,19 @@
-import json
 import os
-from typing import Dict, Any, List, Optional
+import pickle
+from typing import Dict, Any, List, Optional, Set
 from game_types import (
     SkillType, TargetType, Rarity, Objective, QuestStatus,
     Skill, Item, Location, Blueprint, DialogueInstance,
     Conversation, NPC, Quest
 )
+import fastjson
+
+
+# Pickled copy of the parsed data, reused while the JSON sources are unchanged
+CACHE_FILENAME = ".data_cache.pkl"
+# Bump whenever the shape of the cached objects changes so stale caches are rebuilt
+CACHE_VERSION = 3
+_CACHED_ATTRS = ("skills", "items", "quests", "locations", "blueprints", "dialogues", "conversations", "npcs")
 
 
 class DataLoader:
@@ -26,21 +34,66 @@ class DataLoader:
         os.makedirs(data_dir, exist_ok=True)
     
     def load_all_data(self):
-        """Load all game data from JSON files"""
+        """Load all game data, from the binary cache when the JSON files haven't changed"""
         print("Loading game data...")
         
-        self.load_skills()
-        self.load_items()
-        self.load_quests()
-        self.load_locations()
-        self.load_blueprints()
-        self.load_dialogues()
-        self.load_conversations()
-        self.load_npcs()
+        signature = self._source_signature()
+        if not self._load_from_cache(signature):
+            # Start from fresh dicts so callers holding the previous ones aren't mutated
+            for name in _CACHED_ATTRS:
+                setattr(self, name, {})
+            self.load_skills()
+            self.load_items()
+            self.load_quests()
+            self.load_locations()
+            self.load_blueprints()
+            self.load_dialogues()
+            self.load_conversations()
+            self.load_npcs()
+            self._write_cache(signature)
         
         print(f"Loaded: {len(self.skills)} skills, {len(self.items)} items, "
               f"{len(self.quests)} quests, {len(self.locations)} locations")
     
+    def _source_signature(self) -> tuple:
+        """Fingerprint the cache format and the JSON source files by name, modification time and size"""
+        entries = []
+        with os.scandir(self.data_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        return (CACHE_VERSION, tuple(sorted(entries)))
+    
+    def _load_from_cache(self, signature: tuple) -> bool:
+        """Populate all data dicts from the cache file; returns False if it is missing or stale"""
+        filepath = os.path.join(self.data_dir, CACHE_FILENAME)
+        try:
+            with open(filepath, 'rb') as f:
+                cached = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Ignoring unreadable data cache: {e}")
+            return False
+        
+        if cached.get("signature") != signature:
+            return False
+        
+        for name in _CACHED_ATTRS:
+            setattr(self, name, cached[name])
+        return True
+    
+    def _write_cache(self, signature: tuple):
+        """Save the freshly parsed data dicts so the next startup can skip JSON parsing"""
+        cached = {name: getattr(self, name) for name in _CACHED_ATTRS}
+        cached["signature"] = signature
+        try:
+            with open(os.path.join(self.data_dir, CACHE_FILENAME), 'wb') as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"Warning: could not write data cache: {e}")
+    
     def load_skills(self):
         """Load skills from JSON file"""
         filepath = os.path.join(self.data_dir, "skills.json")
@@ -49,8 +102,8 @@ class DataLoader:
             return
         
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                data = fastjson.loads(f.read())
             
             for skill_id, skill_data in data.items():
                 skill = self._create_skill_from_dict(skill_data)
@@ -67,8 +120,8 @@ class DataLoader:
             return
         
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                data = fastjson.loads(f.read())
             
             for item_id, item_data in data.items():
                 item = self._create_item_from_dict(item_data)
@@ -85,8 +138,8 @@ class DataLoader:
             return
         
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                data = fastjson.loads(f.read())
             
             for quest_id, quest_data in data.items():
                 quest = self._create_quest_from_dict(quest_data)
@@ -103,8 +156,8 @@ class DataLoader:
             return
         
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                data = fastjson.loads(f.read())
             
             for location_id, location_data in data.items():
                 location = self._create_location_from_dict(location_data)
@@ -121,8 +174,8 @@ class DataLoader:
             return
         
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                data = fastjson.loads(f.read())
             
             for blueprint_id, blueprint_data in data.items():
                 blueprint = self._create_blueprint_from_dict(blueprint_data)
@@ -139,8 +192,8 @@ class DataLoader:
             return
         
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                data = fastjson.loads(f.read())
             
             for dialogue_id, dialogue_data in data.items():
                 dialogue = self._create_dialogue_from_dict(dialogue_data)
@@ -157,8 +210,8 @@ class DataLoader:
             return
         
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                data = fastjson.loads(f.read())
             
             for conversation_id, conversation_data in data.items():
                 conversation = self._create_conversation_from_dict(conversation_data)
@@ -170,9 +223,11 @@ class DataLoader:
     def load_npcs(self):
         """Load NPCs from JSON file"""
         try:
-            with open(os.path.join(self.data_dir, "npcs.json"), 'r') as f:
-                npc_data = json.load(f)
+            with open(os.path.join(self.data_dir, "npcs.json"), 'rb') as f:
+                npc_data = fastjson.loads(f.read())
             
+            # Set view of each location's NPC list, built on first use, so each placement is an O(1) check
+            location_npcs: Dict[str, Set[str]] = {}
             for npc_id, npc_info in npc_data.items():
                 npc = NPC(
                     id=npc_info['id'],
@@ -192,9 +247,14 @@ class DataLoader:
                 self.npcs[npc_id] = npc
                 
                 # Add NPC to their location
-                if npc.location_id in self.locations:
-                    if npc_id not in self.locations[npc.location_id].npcs:
-                        self.locations[npc.location_id].npcs.append(npc_id)
+                location = self.locations.get(npc.location_id)
+                if location is not None:
+                    placed = location_npcs.get(npc.location_id)
+                    if placed is None:
+                        placed = location_npcs[npc.location_id] = set(location.npcs)
+                    if npc_id not in placed:
+                        placed.add(npc_id)
+                        location.npcs.append(npc_id)
             
             print(f"Loaded {len(self.npcs)} NPCs")
         except FileNotFoundError:
@@ -261,7 +321,7 @@ class DataLoader:
             id=data["id"],
             name=data["name"],
             description=data["description"],
-            entities_within=data.get("entities_within", []),
+            entities_within=set(data.get("entities_within", [])),
             sub_locations=data.get("sub_locations", []),
             quests=data.get("quests", []),
             scene=data.get("scene"),
@@ -2,36 +2,91 @@ from game_types import (
     SkillType, QuestStatus,
     Skill, Item, Location, Blueprint, DialogueInstance,
     Conversation, Stats, Entity, GameState,
-    NPC, Quest, ConversationState
+    NPC, Quest, ConversationState, TICK_CLOCK
 )
-from image import setup_image_generation, generate_game_images, display_image_url, image_gen
 from data_loader import data_loader
 from ai_actions import ai_handler
 from ai_conversation import AIConversationHandler
 from ai_tools import AVAILABLE_TOOLS
 from ai_prompts import get_data_creation_message, get_immediate_action_message, get_data_modification_message
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Any, Tuple
 import random
 from datetime import datetime
+import atexit
+import logging
 import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import uuid
-import json
+import fastjson
+
+log = logging.getLogger("dnd.engine")
+
+# Number of game state mutations between automatic saves
+STATE_SAVE_INTERVAL = 20
+
+# GameState fields refreshed by _update_game_state and written to the delta log between full saves
+STATE_DELTA_FIELDS = (
+    "player_location", "player_health", "player_mana", "player_gold",
+    "player_level", "player_experience", "active_quests", "discovered_locations",
+)
+
+# Shared empty sequence for "no location" lookups so we don't allocate a new list each turn
+_EMPTY_NPCS: tuple = ()
+
+# Travel requirement shown for each destination; anything unlisted is standard travel
+_TRAVEL_REQUIREMENTS = {
+    "village": "Travel by road (free)",
+    "forest": "Walk through wilderness (free)",
+    "cave": "Navigate through forest (free)",
+    "treasure_room": "Find hidden passage (requires exploration)",
+}
+
+
+def _no_image(*args, **kwargs) -> None:
+    """Stand-in for the image hook while images are disabled"""
+    return None
+
+
+# The image module (and requests with it) is only imported once images are enabled
+def _generate_and_show(game_state: Dict[str, Any], event_type: str, caption: Optional[str] = None,
+                       **kwargs) -> Optional[str]:
+    """Generate the image for a game event and print its URL with the caption, if one is given"""
+    from image import generate_game_images, display_image_url
+    url = generate_game_images(game_state, event_type, **kwargs)
+    if url and caption:
+        display_image_url(url, caption)
+    return url
 
 
 class GameEngine:
+    # Generate images on a worker thread; subclasses that read image_gen's cache right after an event set this False
+    background_images: bool = True
+    
     def __init__(self):
+        self._setup_world()
+        self._initialize_game_state()
+        self._initialize_player()
+    
+    def _setup_world(self):
+        """Set up engine fields and load game data, without reading saves or creating the player"""
         self.entities: Dict[str, Entity] = {}
-        self.items: Dict[str, Item] = {}
-        self.skills: Dict[str, Skill] = {}
-        self.quests: Dict[str, Quest] = {}
-        self.locations: Dict[str, Location] = {}
-        self.blueprints: Dict[str, Blueprint] = {}
-        self.dialogues: Dict[str, DialogueInstance] = {}
-        self.conversations: Dict[str, Conversation] = {}
-        self.npcs: Dict[str, NPC] = {}
         self.current_location: Optional[str] = None
         self.player_id: Optional[str] = None
-        self.images_enabled: bool = False
+        # Direct references kept in sync with player_id / current_location to skip dict lookups
+        self._player: Optional[Entity] = None
+        self._current_location_obj: Optional[Location] = None
+        # Game state is written to disk every STATE_SAVE_INTERVAL mutations and on flush_state()
+        self._state_dirty: bool = False
+        self._state_mutation_count: int = 0
+        # Last persisted value of each STATE_DELTA_FIELDS entry, used to build delta log records
+        self._persisted_state_fields: Dict[str, Any] = {}
+        # player._version when player.quests_in_progress was last copied into the game state
+        self._active_quests_version: int = -1
+        # Worker thread for background image generation, created on first use
+        self._image_executor: Optional[ThreadPoolExecutor] = None
+        self.images_enabled = False
         self.game_state: Optional[GameState] = None
         self.ai_conversation_handler: AIConversationHandler = AIConversationHandler()
         
@@ -40,23 +95,83 @@ class GameEngine:
         
         # Setup image generation if enabled
         if self.images_enabled:
+            from image import setup_image_generation
             setup_image_generation()
         
         # Load all game data from JSON files
         data_loader.load_all_data()
         
-        # Copy loaded data to engine
-        self.skills = data_loader.skills.copy()
-        self.items = data_loader.items.copy()
-        self.quests = data_loader.quests.copy()
-        self.locations = data_loader.locations.copy()
-        self.blueprints = data_loader.blueprints.copy()
-        self.dialogues = data_loader.dialogues.copy()
-        self.conversations = data_loader.conversations.copy()
-        self.npcs = data_loader.npcs.copy()
-        
-        self._initialize_game_state()
-        self._initialize_player()
+        # Take ownership of the loaded data; each load_all_data() call builds fresh dicts
+        self.skills: Dict[str, Skill] = data_loader.skills
+        self.items: Dict[str, Item] = data_loader.items
+        self.quests: Dict[str, Quest] = data_loader.quests
+        self.locations: Dict[str, Location] = data_loader.locations
+        self.blueprints: Dict[str, Blueprint] = data_loader.blueprints
+        self.dialogues: Dict[str, DialogueInstance] = data_loader.dialogues
+        self.conversations: Dict[str, Conversation] = data_loader.conversations
+        self.npcs: Dict[str, NPC] = data_loader.npcs
+        
+        # Reverse index of quest ID -> name of the location offering it
+        self._quest_to_location: Dict[str, str] = {}
+        self._rebuild_quest_location_index()
+        
+        # Location ID -> other locations reachable with 'travel' (everything except itself and its sub-locations)
+        self._non_sub_accessible: Dict[str, List[str]] = {}
+        self._rebuild_travel_index()
+        
+        # Pre-rendered display text keyed by (kind, ID); cleared whenever game data is modified
+        self._display_blocks: Dict[Tuple[str, str], str] = {}
+        
+        # Skill IDs split by skill type for the skillbook; regrouped whenever game data is modified
+        self._active_skill_ids: List[str] = []
+        self._passive_skill_ids: List[str] = []
+        self._active_skill_set: frozenset = frozenset()
+        # Whether the player knows an active skill, and player._version when that was last checked
+        self._player_has_active_skill: bool = False
+        self._active_skill_check_version: int = -1
+        self._rebuild_skill_groups()
+        
+        # Last get_available_actions() result and the (location, skill count, location count) it was built for
+        self._available_actions: List[str] = []
+        self._available_actions_key: Optional[tuple] = None
+        
+        # Data catalogs for the AI modification context, built on first use
+        self._catalog_context: Optional[Dict[str, Any]] = None
+    
+    @property
+    def images_enabled(self) -> bool:
+        return self._emit_image is not _no_image
+    
+    @images_enabled.setter
+    def images_enabled(self, enabled: bool):
+        """Bind the image hook once so disabled games skip image generation without a per-event check"""
+        if not enabled:
+            self._emit_image = _no_image
+        elif self.background_images:
+            self._emit_image = self._queue_image
+        else:
+            self._emit_image = self._show_image
+    
+    def _image_context(self) -> Dict[str, Any]:
+        """Snapshot of the few game details passed to image generation, instead of the whole engine"""
+        player = self._player
+        location = self._current_location_obj
+        return {
+            "player_name": player.name if player else None,
+            "player_level": player.stats.level if player else None,
+            "player_location": self.current_location,
+            "location_name": location.name if location else None,
+        }
+    
+    def _show_image(self, event_type: str, caption: Optional[str] = None, **kwargs):
+        """Generate an event image and print its URL before returning"""
+        _generate_and_show(self._image_context(), event_type, caption, **kwargs)
+    
+    def _queue_image(self, event_type: str, caption: Optional[str] = None, **kwargs):
+        """Generate an event image on the background worker so the prompt returns immediately"""
+        if self._image_executor is None:
+            self._image_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image")
+        self._image_executor.submit(_generate_and_show, self._image_context(), event_type, caption, **kwargs)
     
     def _initialize_game_state(self):
         """Initialize or load game state"""
@@ -82,7 +197,19 @@ class GameEngine:
                 world_events=[],
                 temporary_effects={}
             )
-            self.game_state.save_to_file()
+            # The save on disk exists but could not be read; play on without touching it
+            self.game_state._read_only = True
+            print("⚠️  Saved game could not be loaded; this session will not be saved so the old files stay intact.")
+        else:
+            # Fold any delta log from the last session into a full save, so this session's deltas have a base
+            self.game_state.compact()
+        self._seed_persisted_state_fields()
+    
+    def _seed_persisted_state_fields(self):
+        """The game state's values are on disk; only fields that differ from them need logging"""
+        for name in STATE_DELTA_FIELDS:
+            value = getattr(self.game_state, name)
+            self._persisted_state_fields[name] = value.copy() if isinstance(value, list) else value
     
     def _update_game_state(self):
         """Update game state with current player and world status"""
@@ -90,19 +217,49 @@ class GameEngine:
             return
             
         player = self.get_player()
+        stats = player.stats
         self.game_state.player_location = self.current_location
-        self.game_state.player_health = player.stats.health
-        self.game_state.player_mana = player.stats.mana
+        self.game_state.player_health = stats.health
+        self.game_state.player_mana = stats.mana
         self.game_state.player_gold = player.gold
-        self.game_state.player_level = player.stats.level
-        self.game_state.player_experience = player.stats.experience
-        self.game_state.active_quests = player.quests_in_progress.copy()
+        self.game_state.player_level = stats.level
+        self.game_state.player_experience = stats.experience
+        # The player's version changes whenever their quests do
+        if player._version != self._active_quests_version:
+            self.game_state.active_quests = player.quests_in_progress.copy()
+            self._active_quests_version = player._version
         
         # Add current location to discovered locations
-        if self.current_location not in self.game_state.discovered_locations:
-            self.game_state.discovered_locations.append(self.current_location)
-        
-        self.game_state.save_to_file()
+        self.game_state.discover_location(self.current_location)
+        
+        # Log only the fields that changed since they were last persisted
+        delta = {}
+        for name in STATE_DELTA_FIELDS:
+            value = getattr(self.game_state, name)
+            if self._persisted_state_fields.get(name) != value:
+                delta[name] = value
+                self._persisted_state_fields[name] = value.copy() if isinstance(value, list) else value
+        if delta:
+            self.game_state.append_delta(delta)
+        
+        self._mark_state_dirty()
+    
+    def _mark_state_dirty(self):
+        """Record an in-memory game state change, writing to disk only every few mutations."""
+        self._state_dirty = True
+        self._state_mutation_count += 1
+        if self._state_mutation_count % STATE_SAVE_INTERVAL == 0:
+            self.flush_state()
+    
+    def flush_state(self):
+        """Write the full game state to disk if it has unsaved changes, compacting the delta log."""
+        if not self.game_state:
+            return
+        if self._state_dirty:
+            self.game_state.compact()
+            self._state_dirty = False
+        else:
+            self.game_state.flush()
     
     def _initialize_player(self):
         """Initialize the player with basic stats and starting equipment"""
@@ -134,22 +291,21 @@ class GameEngine:
         
         self.entities["player"] = player
         self.player_id = "player"
+        self._player = player
         
         # Generate character portrait if images enabled
-        if self.images_enabled:
-            generate_game_images(self.__dict__, "character_creation", character=player)
+        self._emit_image("character_creation", character=player)
         
         # Set starting location
         if "tavern" in self.locations:
             self.current_location = "tavern"
             # Add player to tavern
             tavern = self.locations["tavern"]
-            if self.player_id not in tavern.entities_within:
-                tavern.entities_within.append(self.player_id)
+            self._current_location_obj = tavern
+            tavern.entities_within.add(self.player_id)
             
             # Generate location image if images enabled
-            if self.images_enabled:
-                generate_game_images(self.__dict__, "location_enter", location=tavern)
+            self._emit_image("location_enter", location=tavern)
             
             # Show scene-setting text
             self.show_scene()
@@ -165,13 +321,63 @@ class GameEngine:
         else:
             print(f"\n{location.description}")
     
+    def to_snapshot(self) -> Dict[str, Any]:
+        """Capture the live player and location occupancy as plain data, using IDs instead of object references"""
+        player = self.get_player()
+        return {
+            "player": {
+                "id": player.id,
+                "name": player.name,
+                "stats": player.stats.to_dict(),
+                "inventory": list(player.inventory),
+                "skills": list(player.skills),
+                "blue_dot": player.blue_dot,
+                "quests_in_progress": list(player.quests_in_progress),
+                "lore": dict(player.lore),
+                "gold": player.gold,
+            },
+            "current_location": self.current_location,
+            "occupancy": {
+                loc_id: sorted(location.entities_within)
+                for loc_id, location in self.locations.items() if location.entities_within
+            },
+        }
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any], game_state: Optional[GameState] = None) -> 'GameEngine':
+        """
+        Rebuild an engine from to_snapshot() without creating a fresh player or printing the scene.
+        Nothing is read from or written to the save files unless a loaded game_state is passed in.
+        """
+        game = cls.__new__(cls)
+        game._setup_world()
+        if game_state is not None:
+            game.game_state = game_state
+            game._seed_persisted_state_fields()
+        
+        player_data = dict(snapshot["player"])
+        player_data["stats"] = Stats(**player_data["stats"])
+        player = Entity(**player_data)
+        game.entities[player.id] = player
+        game.player_id = player.id
+        game._player = player
+        
+        occupancy = snapshot["occupancy"]
+        for loc_id, location in game.locations.items():
+            location.entities_within = set(occupancy.get(loc_id, ()))
+        game.current_location = snapshot["current_location"]
+        game._current_location_obj = game.locations.get(game.current_location)
+        
+        game._update_game_state()
+        return game
+    
     def get_player(self) -> Entity:
         """Get the current player entity"""
-        return self.entities[self.player_id]
+        return self._player
     
     def get_current_location(self) -> Location:
         """Get the current location"""
-        return self.locations[self.current_location]
+        return self._current_location_obj
     
     def move_to_location(self, location_id: str) -> bool:
         """Move player to a new location, only allowing free movement to sub-locations."""
@@ -187,22 +393,17 @@ class GameEngine:
         
         # Remove player from current location
         if self.current_location:
-            if self.player_id in current_loc.entities_within:
-                current_loc.entities_within.remove(self.player_id)
+            current_loc.entities_within.discard(self.player_id)
         
         # Add player to new location
         new_loc = self.locations[location_id]
-        if self.player_id not in new_loc.entities_within:
-            new_loc.entities_within.append(self.player_id)
+        new_loc.entities_within.add(self.player_id)
         
         self.current_location = location_id
+        self._current_location_obj = new_loc
         
         # Generate location image if images enabled
-        if self.images_enabled:
-            generate_game_images(self.__dict__, "location_enter", location=new_loc)
-            cached_url = image_gen.get_cached_image(f"location_{location_id}")
-            if cached_url:
-                display_image_url(cached_url, f"Welcome to {new_loc.name}!")
+        self._emit_image("location_enter", f"Welcome to {new_loc.name}!", location=new_loc)
         
         # Show scene-setting text
         self.show_scene()
@@ -215,31 +416,28 @@ class GameEngine:
         """Use a skill"""
         player = self.get_player()
         
-        if skill_id not in player.skills:
+        if not player.has_skill(skill_id):
             print(f"You don't have the skill {skill_id}")
             return False
         
         skill = self.skills[skill_id]
         
         if skill.skill_type == SkillType.ACTIVE:
-            if player.stats.mana < skill.cost:
-                print(f"Not enough mana! Need {skill.cost}, have {player.stats.mana}")
+            stats = player.stats
+            if stats.mana < skill.cost:
+                print(f"Not enough mana! Need {skill.cost}, have {stats.mana}")
                 return False
             
-            player.stats.mana -= skill.cost
+            stats.mana -= skill.cost
             print(f"Used {skill.name}: {skill.description}")
             
             # Generate skill effect image if images enabled
-            if self.images_enabled:
-                generate_game_images(self.__dict__, "skill_used", skill=skill)
-                cached_url = image_gen.get_cached_image(f"skill_{skill_id}")
-                if cached_url:
-                    display_image_url(cached_url, f"{skill.name} effect!")
+            self._emit_image("skill_used", f"{skill.name} effect!", skill=skill)
             
             # Simple effect simulation
             if skill_id == "healing":
                 heal_amount = 20
-                player.stats.health = min(player.stats.max_health, player.stats.health + heal_amount)
+                stats.health = min(stats.max_health, stats.health + heal_amount)
                 print(f"Healed for {heal_amount} HP!")
         
         # Update game state
@@ -266,8 +464,7 @@ class GameEngine:
             return False
         
         quest.status = QuestStatus.IN_PROGRESS
-        if quest_id not in player.quests_in_progress:
-            player.quests_in_progress.append(quest_id)
+        player.add_quest(quest_id)
         
         print(f"Started quest: {quest.name}")
         print(f"Description: {quest.description}")
@@ -275,11 +472,7 @@ class GameEngine:
             print(f"- {obj.description}")
         
         # Generate quest scene image if images enabled
-        if self.images_enabled:
-            generate_game_images(self.__dict__, "quest_started", quest=quest)
-            cached_url = image_gen.get_cached_image(f"quest_{quest_id}")
-            if cached_url:
-                display_image_url(cached_url, f"Quest: {quest.name}")
+        self._emit_image("quest_started", f"Quest: {quest.name}", quest=quest)
         
         # Update game state
         self._update_game_state()
@@ -292,62 +485,64 @@ class GameEngine:
             return False
         
         player = self.get_player()
-        if item_id not in player.inventory:
-            player.inventory.append(item_id)
+        if player.add_item(item_id):
             item = self.items[item_id]
             print(f"Added {item.name} to inventory")
             
             # Generate item image if images enabled
-            if self.images_enabled:
-                generate_game_images(self.__dict__, "item_obtained", item=item)
-                cached_url = image_gen.get_cached_image(f"item_{item_id}")
-                if cached_url:
-                    display_image_url(cached_url, f"Obtained: {item.name}")
+            self._emit_image("item_obtained", f"Obtained: {item.name}", item=item)
             
             # If item has a skill, add it to player's skills
-            if item.skill and item.skill.id not in player.skills:
-                player.skills.append(item.skill.id)
+            if item.skill and player.learn_skill(item.skill.id):
                 print(f"Learned skill: {item.skill.name}")
         
         # Update game state
         self._update_game_state()
         return True
     
-    def simulate_combat(self, enemy_name: str = "Goblin") -> bool:
-        """Simulate a combat encounter"""
+    def simulate_combat(self, enemy_name: str = "Goblin", verbose: bool = True) -> bool:
+        """Simulate a combat encounter; with verbose=False only a one-line summary is printed"""
         player = self.get_player()
         location = self.get_current_location()
         
         print(f"\n⚔️  Combat started with {enemy_name}!")
         
         # Generate combat scene image if images enabled
-        if self.images_enabled:
-            generate_game_images(self.__dict__, "combat_started", 
-                               player=player, enemy=enemy_name, location=location)
-            cached_url = image_gen.get_cached_image(f"combat_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-            if cached_url:
-                display_image_url(cached_url, f"Combat with {enemy_name}!")
+        self._emit_image("combat_started", f"Combat with {enemy_name}!",
+                         player=player, enemy=enemy_name, location=location)
         
         # Simple combat simulation
+        stats = player.stats
+        randint = random.randint
         enemy_health = 30
-        while enemy_health > 0 and player.stats.health > 0:
+        rounds = damage_dealt = damage_taken = 0
+        while enemy_health > 0 and stats.health > 0:
+            rounds += 1
             # Player attacks
-            damage = player.stats.strength + random.randint(1, 6)
+            damage = stats.strength + randint(1, 6)
             enemy_health -= damage
-            print(f"You deal {damage} damage to {enemy_name}!")
+            damage_dealt += damage
+            if verbose:
+                print(f"You deal {damage} damage to {enemy_name}!")
             
             if enemy_health <= 0:
-                print(f"You defeated {enemy_name}!")
                 break
             
             # Enemy attacks
-            enemy_damage = random.randint(5, 15)
-            player.stats.health -= enemy_damage
-            print(f"{enemy_name} deals {enemy_damage} damage to you!")
-            
-            if player.stats.health <= 0:
-                print(f"You were defeated by {enemy_name}!")
-                return False
+            enemy_damage = randint(5, 15)
+            stats.health -= enemy_damage
+            damage_taken += enemy_damage
+            if verbose:
+                print(f"{enemy_name} deals {enemy_damage} damage to you!")
+        
+        if not verbose:
+            print(f"{rounds} rounds: you dealt {damage_dealt} damage and took {damage_taken}.")
+        
+        if stats.health <= 0:
+            print(f"You were defeated by {enemy_name}!")
+            return False
+        
+        print(f"You defeated {enemy_name}!")
         
         # Update game state
         self._update_game_state()
@@ -356,25 +551,22 @@ class GameEngine:
     def level_up_player(self) -> bool:
         """Level up the player"""
         player = self.get_player()
-        new_level = player.stats.level + 1
+        stats = player.stats
+        new_level = stats.level + 1
         
-        player.stats.level = new_level
-        player.stats.max_health += 10
-        player.stats.health = player.stats.max_health
-        player.stats.max_mana += 5
-        player.stats.mana = player.stats.max_mana
-        player.stats.strength += 2
-        player.stats.experience += 100
+        stats.level = new_level
+        stats.max_health += 10
+        stats.health = stats.max_health
+        stats.max_mana += 5
+        stats.mana = stats.max_mana
+        stats.strength += 2
+        stats.experience += 100
         
         print(f"\n🎉 Level Up! You are now level {new_level}!")
-        print(f"Health: {player.stats.max_health}, Mana: {player.stats.max_mana}")
+        print(f"Health: {stats.max_health}, Mana: {stats.max_mana}")
         
         # Generate level up image if images enabled
-        if self.images_enabled:
-            generate_game_images(self.__dict__, "level_up", character=player, new_level=new_level)
-            cached_url = image_gen.get_cached_image(f"levelup_{player.id}_{new_level}")
-            if cached_url:
-                display_image_url(cached_url, f"Level {new_level} achieved!")
+        self._emit_image("level_up", f"Level {new_level} achieved!", character=player, new_level=new_level)
         
         # Update game state
         self._update_game_state()
@@ -382,102 +574,125 @@ class GameEngine:
     
     def show_status(self):
         """Display current player status"""
+        out = []
         player = self.get_player()
         location = self.get_current_location()
         
-        # Ensure player has gold attribute
-        if not hasattr(player, 'gold'):
-            player.gold = 100
-        
-        print("\n" + "="*50)
-        print(f"Player: {player.name} (Level {player.stats.level})")
-        print(f"Location: {location.name}")
-        print(f"Health: {player.stats.health}/{player.stats.max_health}")
-        print(f"Mana: {player.stats.mana}/{player.stats.max_mana}")
-        print(f"Gold: {player.gold}")
-        print(f"Experience: {player.stats.experience}")
-        print(f"Inventory: {len(player.inventory)} items")
-        print(f"Skills: {len(player.skills)} skills")
-        print(f"Active Quests: {len(player.quests_in_progress)}")
-        print(f"Images: {'Enabled' if self.images_enabled else 'Disabled'}")
-        print("="*50)
+        out.append("\n" + "="*50)
+        out.append(f"Player: {player.name} (Level {player.stats.level})")
+        out.append(f"Location: {location.name}")
+        out.append(f"Health: {player.stats.health}/{player.stats.max_health}")
+        out.append(f"Mana: {player.stats.mana}/{player.stats.max_mana}")
+        out.append(f"Gold: {player.gold}")
+        out.append(f"Experience: {player.stats.experience}")
+        out.append(f"Inventory: {len(player.inventory)} items")
+        out.append(f"Skills: {len(player.skills)} skills")
+        out.append(f"Active Quests: {len(player.quests_in_progress)}")
+        out.append(f"Images: {'Enabled' if self.images_enabled else 'Disabled'}")
+        out.append("="*50)
+        sys.stdout.write("\n".join(out) + "\n")
     
     def show_inventory(self):
         """Display player's inventory"""
+        out = []
         player = self.get_player()
-        print("\n--- INVENTORY ---")
+        out.append("\n--- INVENTORY ---")
         for item_id in player.inventory:
-            item = self.items[item_id]
-            print(f"- {item.name} ({item.rarity.value})")
-            print(f"  {item.description}")
-            if item.skill:
-                print(f"  Skill: {item.skill.name}")
-        print("----------------")
+            out.append(self._item_block(item_id))
+        out.append("----------------")
+        sys.stdout.write("\n".join(out) + "\n")
     
     def show_skills(self):
         """Display player's skills"""
+        out = []
         player = self.get_player()
-        print("\n--- SKILLS ---")
+        out.append("\n--- SKILLS ---")
         for skill_id in player.skills:
-            skill = self.skills[skill_id]
-            print(f"- {skill.name} ({skill.skill_type.value})")
-            print(f"  {skill.description}")
-            print(f"  Cost: {skill.cost} mana, Range: {skill.range}")
-        print("---------------")
+            out.append(self._skill_block(skill_id))
+        out.append("---------------")
+        sys.stdout.write("\n".join(out) + "\n")
     
     def show_skillbook(self):
         """Display all available skills in a skillbook format."""
-        print("\n" + "="*50)
-        print("📚 SKILLBOOK")
-        print("="*50)
-        
-        # Group skills by type
-        active_skills = []
-        passive_skills = []
-        
-        for skill_id, skill in self.skills.items():
-            if skill.skill_type == SkillType.ACTIVE:
-                active_skills.append((skill_id, skill))
-            else:
-                passive_skills.append((skill_id, skill))
+        out = []
+        out.append("\n" + "="*50)
+        out.append("📚 SKILLBOOK")
+        out.append("="*50)
         
         # Show active skills
-        if active_skills:
-            print("⚡ ACTIVE SKILLS (require mana and action):")
-            for skill_id, skill in active_skills:
-                print(f"   • {skill.name}")
-                print(f"     Description: {skill.description}")
-                print(f"     Target: {skill.target.value}")
-                print(f"     Range: {skill.range}ft, Area: {skill.area_of_effect}ft")
-                print(f"     Mana Cost: {skill.cost}")
-                print()
+        if self._active_skill_ids:
+            out.append("⚡ ACTIVE SKILLS (require mana and action):")
+            for skill_id in self._active_skill_ids:
+                out.append(self._skillbook_block(skill_id))
         
         # Show passive skills
-        if passive_skills:
-            print("🛡️  PASSIVE SKILLS (always active):")
-            for skill_id, skill in passive_skills:
-                print(f"   • {skill.name}")
-                print(f"     Description: {skill.description}")
-                print(f"     Target: {skill.target.value}")
-                print()
+        if self._passive_skill_ids:
+            out.append("🛡️  PASSIVE SKILLS (always active):")
+            for skill_id in self._passive_skill_ids:
+                out.append(self._skillbook_block(skill_id))
         
         # Show player's learned skills
         player = self.get_player()
         learned_skills = [skill_id for skill_id in player.skills if skill_id in self.skills]
         if learned_skills:
-            print("🎓 YOUR LEARNED SKILLS:")
+            out.append("🎓 YOUR LEARNED SKILLS:")
             for skill_id in learned_skills:
                 skill = self.skills[skill_id]
-                status = "✓" if skill_id in player.skills else "○"
-                print(f"   {status} {skill.name} ({skill.skill_type.value})")
+                status = "✓" if player.has_skill(skill_id) else "○"
+                out.append(f"   {status} {skill.name} ({skill.skill_type.value})")
         
-        print("="*50)
+        out.append("="*50)
+        sys.stdout.write("\n".join(out) + "\n")
+    
+    def _item_block(self, item_id: str) -> str:
+        """Inventory listing for an item, rendered once and reused until data is modified."""
+        key = ("item", item_id)
+        block = self._display_blocks.get(key)
+        if block is None:
+            item = self.items[item_id]
+            lines = [f"- {item.name} ({item.rarity.value})", f"  {item.description}"]
+            if item.skill:
+                lines.append(f"  Skill: {item.skill.name}")
+            block = self._display_blocks[key] = "\n".join(lines)
+        return block
+    
+    def _skill_block(self, skill_id: str) -> str:
+        """Skill list entry, rendered once and reused until data is modified."""
+        key = ("skill", skill_id)
+        block = self._display_blocks.get(key)
+        if block is None:
+            skill = self.skills[skill_id]
+            block = self._display_blocks[key] = (
+                f"- {skill.name} ({skill.skill_type.value})\n"
+                f"  {skill.description}\n"
+                f"  Cost: {skill.cost} mana, Range: {skill.range}"
+            )
+        return block
+    
+    def _skillbook_block(self, skill_id: str) -> str:
+        """Skillbook entry (including its trailing blank line), rendered once and reused until data is modified."""
+        key = ("skillbook", skill_id)
+        block = self._display_blocks.get(key)
+        if block is None:
+            skill = self.skills[skill_id]
+            lines = [
+                f"   • {skill.name}",
+                f"     Description: {skill.description}",
+                f"     Target: {skill.target.value}",
+            ]
+            if skill.skill_type == SkillType.ACTIVE:
+                lines.append(f"     Range: {skill.range}ft, Area: {skill.area_of_effect}ft")
+                lines.append(f"     Mana Cost: {skill.cost}")
+            lines.append("")
+            block = self._display_blocks[key] = "\n".join(lines)
+        return block
     
     def show_available_quests(self):
         """Display only quests that the player can access and start at current location."""
-        print("\n" + "="*50)
-        print("📜 AVAILABLE QUESTS")
-        print("="*50)
+        out = []
+        out.append("\n" + "="*50)
+        out.append("📜 AVAILABLE QUESTS")
+        out.append("="*50)
         
         current_loc = self.get_current_location()
         available_quests = []
@@ -489,35 +704,36 @@ class GameEngine:
                 available_quests.append((quest_id, quest, "current_location"))
         
         if available_quests:
-            print("🎯 Quests you can start here:")
+            out.append("🎯 Quests you can start here:")
             for quest_id, quest, access_type in available_quests:
-                print(f"   • {quest.name} (Level {quest.level})")
-                print(f"     {quest.description}")
-                print("     Objectives:")
+                out.append(f"   • {quest.name} (Level {quest.level})")
+                out.append(f"     {quest.description}")
+                out.append("     Objectives:")
                 for obj in quest.objectives:
-                    print(f"       - {obj.description}")
-                print(f"     Reward: {self._format_reward(quest.reward)}")
-                print(f"     Command: start {quest_id}")
-                print()
+                    out.append(f"       - {obj.description}")
+                out.append(f"     Reward: {self._format_reward(quest.reward)}")
+                out.append(f"     Command: start {quest_id}")
+                out.append("")
         else:
-            print("   No quests available at this location.")
-            print("   Explore other locations to find new quests!")
+            out.append("   No quests available at this location.")
+            out.append("   Explore other locations to find new quests!")
         
         # Show active quests
         player = self.get_player()
         if player.quests_in_progress:
-            print("🔄 ACTIVE QUESTS:")
+            out.append("🔄 ACTIVE QUESTS:")
             for quest_id in player.quests_in_progress:
                 if quest_id in self.quests:
                     quest = self.quests[quest_id]
-                    print(f"   • {quest.name}")
+                    out.append(f"   • {quest.name}")
                     for obj in quest.objectives:
                         progress = f"{obj.current_count}/{obj.required_count}"
                         status = "✓" if obj.completed else "○"
-                        print(f"     {status} {obj.description} [{progress}]")
-                    print()
+                        out.append(f"     {status} {obj.description} [{progress}]")
+                    out.append("")
         
-        print("="*50)
+        out.append("="*50)
+        sys.stdout.write("\n".join(out) + "\n")
     
     def _can_access_quest(self, quest_id: str) -> bool:
         """Check if player can access a quest."""
@@ -544,50 +760,95 @@ class GameEngine:
                 parts.append(f"Items: {', '.join(item_names)}")
         return ", ".join(parts)
     
+    def _rebuild_quest_location_index(self):
+        """Rebuild the quest -> location name index; call after locations or their quests change."""
+        index = {}
+        for location in self.locations.values():
+            for quest_id in location.quests:
+                index.setdefault(quest_id, location.name)
+        self._quest_to_location = index
+    
+    def _rebuild_travel_index(self):
+        """Rebuild the per-location list of non-sub-location travel destinations."""
+        self._non_sub_accessible = {
+            loc_id: [
+                other_id for other_id in self.locations
+                if other_id != loc_id and other_id not in location.sub_locations
+            ]
+            for loc_id, location in self.locations.items()
+        }
+    
+    def _invalidate_derived_data(self):
+        """Drop caches built from game data after a modification is applied or reverted."""
+        self._display_blocks.clear()
+        self._rebuild_quest_location_index()
+        self._rebuild_skill_groups()
+        self._rebuild_travel_index()
+        self._available_actions_key = None
+        self._catalog_context = None
+    
+    def _rebuild_skill_groups(self):
+        """Split skill IDs into active and passive lists for the skillbook."""
+        self._active_skill_ids = []
+        self._passive_skill_ids = []
+        for skill_id, skill in self.skills.items():
+            if skill.skill_type == SkillType.ACTIVE:
+                self._active_skill_ids.append(skill_id)
+            else:
+                self._passive_skill_ids.append(skill_id)
+        self._active_skill_set = frozenset(self._active_skill_ids)
+        self._active_skill_check_version = -1
+    
+    def _has_active_skill(self, player: Entity) -> bool:
+        """Whether the player knows an active skill; rechecked only when the player's version changes."""
+        if player._version != self._active_skill_check_version:
+            self._player_has_active_skill = not self._active_skill_set.isdisjoint(player.skills)
+            self._active_skill_check_version = player._version
+        return self._player_has_active_skill
+    
     def _get_quest_location(self, quest_id: str) -> str:
         """Get the location where a quest is available."""
-        for loc_id, location in self.locations.items():
-            if quest_id in location.quests:
-                return location.name
-        return "Unknown"
+        return self._quest_to_location.get(quest_id, "Unknown")
     
     def show_shop(self):
         """Display the shop inventory and allow purchasing."""
+        out = []
         current_loc = self.get_current_location()
         
         # Check if current location has a shop
-        if not hasattr(current_loc, 'shop_items') or not current_loc.shop_items:
+        if not current_loc.shop_items:
             print("   This location doesn't have a shop.")
             return
         
-        print("\n" + "="*50)
-        print("🏪 SHOP")
-        print("="*50)
+        out.append("\n" + "="*50)
+        out.append("🏪 SHOP")
+        out.append("="*50)
         
-        print(f"Welcome to the shop in {current_loc.name}!")
-        print("Available items:")
+        out.append(f"Welcome to the shop in {current_loc.name}!")
+        out.append("Available items:")
         
         for item_id in current_loc.shop_items:
             if item_id in self.items:
                 item = self.items[item_id]
-                print(f"   • {item.name} ({item.rarity.value})")
-                print(f"     {item.description}")
-                print(f"     Price: {item.cost} gold")
+                out.append(f"   • {item.name} ({item.rarity.value})")
+                out.append(f"     {item.description}")
+                out.append(f"     Price: {item.cost} gold")
                 if item.skill:
-                    print(f"     Grants skill: {item.skill.name}")
-                print()
-        
-        print("Commands:")
-        print("   buy <item_id> - Purchase an item")
-        print("   sell <item_id> - Sell an item from your inventory")
-        print("="*50)
+                    out.append(f"     Grants skill: {item.skill.name}")
+                out.append("")
+        
+        out.append("Commands:")
+        out.append("   buy <item_id> - Purchase an item")
+        out.append("   sell <item_id> - Sell an item from your inventory")
+        out.append("="*50)
+        sys.stdout.write("\n".join(out) + "\n")
     
     def buy_item(self, item_id: str) -> bool:
         """Buy an item from the shop."""
         current_loc = self.get_current_location()
         
         # Check if shop exists and item is available
-        if not hasattr(current_loc, 'shop_items') or item_id not in current_loc.shop_items:
+        if item_id not in current_loc.shop_items:
             print(f"Item {item_id} is not available in this shop.")
             return False
         
@@ -598,24 +859,20 @@ class GameEngine:
         item = self.items[item_id]
         player = self.get_player()
         
-        # Check if player has enough gold (assuming player has gold attribute)
-        if not hasattr(player, 'gold'):
-            player.gold = 100
-        
+        # Check if player has enough gold
         if player.gold < item.cost:
             print(f"You don't have enough gold! Need {item.cost}, have {player.gold}")
             return False
         
         # Purchase the item
         player.gold -= item.cost
-        player.inventory.append(item_id)
+        player.add_item(item_id, stack=True)
         
         print(f"Purchased {item.name} for {item.cost} gold!")
         print(f"Remaining gold: {player.gold}")
         
         # If item grants a skill, add it
-        if item.skill and item.skill.id not in player.skills:
-            player.skills.append(item.skill.id)
+        if item.skill and player.learn_skill(item.skill.id):
             print(f"Learned skill: {item.skill.name}")
         
         # Update game state
@@ -624,6 +881,7 @@ class GameEngine:
     
     def show_npcs(self):
         """Display NPCs at the current location."""
+        out = []
         current_loc = self.get_current_location()
         npcs_here = []
         
@@ -635,22 +893,23 @@ class GameEngine:
             print("   No NPCs are present at this location.")
             return
         
-        print("\n" + "="*50)
-        print("👥 NPCs HERE")
-        print("="*50)
+        out.append("\n" + "="*50)
+        out.append("👥 NPCs HERE")
+        out.append("="*50)
         
         for npc in npcs_here:
-            print(f"   • {npc.name}")
-            print(f"     {npc.description}")
-            print(f"     Personality: {npc.personality}")
+            out.append(f"   • {npc.name}")
+            out.append(f"     {npc.description}")
+            out.append(f"     Personality: {npc.personality}")
             if npc.quests_offered:
-                print(f"     Offers quests: {', '.join(npc.quests_offered)}")
+                out.append(f"     Offers quests: {', '.join(npc.quests_offered)}")
             if npc.shop_items:
-                print(f"     Sells items: {', '.join(npc.shop_items)}")
-            print(f"     Command: talk {npc.id}")
-            print()
+                out.append(f"     Sells items: {', '.join(npc.shop_items)}")
+            out.append(f"     Command: talk {npc.id}")
+            out.append("")
         
-        print("="*50)
+        out.append("="*50)
+        sys.stdout.write("\n".join(out) + "\n")
     
     def talk_to_npc(self, npc_id: str, player_input: str = None) -> bool:
         """Start or continue a conversation with an NPC."""
@@ -707,10 +966,8 @@ class GameEngine:
             
             # Update conversation history
             if self.game_state:
-                if npc_id not in self.game_state.conversation_history:
-                    self.game_state.conversation_history[npc_id] = []
-                self.game_state.conversation_history[npc_id].append(f"Talked at {datetime.now().isoformat()}")
-                self.game_state.save_to_file()
+                self.game_state.record_conversation(npc_id, f"Talked at {TICK_CLOCK.iso()}")
+                self._mark_state_dirty()
             
             return True
         
@@ -791,7 +1048,7 @@ class GameEngine:
         # Update game state
         if self.game_state:
             self.game_state.conversation_states[npc_id] = conversation_state
-            self.game_state.save_to_file()
+            self._mark_state_dirty()
         
         return True
     
@@ -866,106 +1123,111 @@ class GameEngine:
         # Update game state
         if self.game_state:
             self.game_state.conversation_states[npc.id] = conversation_state
-            self.game_state.save_to_file()
+            self._mark_state_dirty()
         
         return True
     
     def show_locations(self):
         """Display available locations"""
+        out = []
         current_loc = self.get_current_location()
-        print("\n--- LOCATIONS ---")
-        print(f"Current: {current_loc.name}")
-        print("Available:")
+        out.append("\n--- LOCATIONS ---")
+        out.append(f"Current: {current_loc.name}")
+        out.append("Available:")
         for location_id, location in self.locations.items():
             if location_id != self.current_location:
-                print(f"- {location.name}: {location.description[:50]}...")
-        print("-----------------")
+                out.append(f"- {location.name}: {location.description[:50]}...")
+        out.append("-----------------")
+        sys.stdout.write("\n".join(out) + "\n")
     
     def list_data(self, data_type: str):
         """List all available data of a specific type"""
+        out = []
         if data_type == "skills":
-            print(f"\n--- ALL SKILLS ({len(self.skills)}) ---")
+            out.append(f"\n--- ALL SKILLS ({len(self.skills)}) ---")
             for skill_id, skill in self.skills.items():
-                print(f"- {skill.name}: {skill.description}")
+                out.append(f"- {skill.name}: {skill.description}")
         elif data_type == "items":
-            print(f"\n--- ALL ITEMS ({len(self.items)}) ---")
+            out.append(f"\n--- ALL ITEMS ({len(self.items)}) ---")
             for item_id, item in self.items.items():
-                print(f"- {item.name} ({item.rarity.value}): {item.description}")
+                out.append(f"- {item.name} ({item.rarity.value}): {item.description}")
         elif data_type == "quests":
-            print(f"\n--- ALL QUESTS ({len(self.quests)}) ---")
+            out.append(f"\n--- ALL QUESTS ({len(self.quests)}) ---")
             for quest_id, quest in self.quests.items():
-                print(f"- {quest.name} (Level {quest.level}): {quest.description}")
+                out.append(f"- {quest.name} (Level {quest.level}): {quest.description}")
         elif data_type == "locations":
-            print(f"\n--- ALL LOCATIONS ({len(self.locations)}) ---")
+            out.append(f"\n--- ALL LOCATIONS ({len(self.locations)}) ---")
             for location_id, location in self.locations.items():
-                print(f"- {location.name}: {location.description[:50]}...")
+                out.append(f"- {location.name}: {location.description[:50]}...")
         else:
-            print(f"Unknown data type: {data_type}")
-
+            out.append(f"Unknown data type: {data_type}")
+        sys.stdout.write("\n".join(out) + "\n")
+    
     def show_map(self):
         """Display a simple directed map showing where you can travel from your current location."""
+        out = []
         current_loc = self.get_current_location()
-        print("\n" + "="*50)
-        print("🗺️  TRAVEL MAP")
-        print("="*50)
+        out.append("\n" + "="*50)
+        out.append("🗺️  TRAVEL MAP")
+        out.append("="*50)
         
         # Show current location info
-        print(f"📍 You are at: {current_loc.name}")
-        print(f"   {current_loc.description}")
+        out.append(f"📍 You are at: {current_loc.name}")
+        out.append(f"   {current_loc.description}")
         
         # Show available quests at current location
         if current_loc.quests:
-            print("\n📜 Quests available here:")
+            out.append("\n📜 Quests available here:")
             for quest_id in current_loc.quests:
                 quest = self.quests[quest_id]
                 if quest.status == QuestStatus.NOT_STARTED:
-                    print(f"   • {quest.name}: {quest.description}")
+                    out.append(f"   • {quest.name}: {quest.description}")
         
         # Show NPCs at current location
         if current_loc.npcs:
-            print("\n👥 NPCs here:")
+            out.append("\n👥 NPCs here:")
             for npc_id in current_loc.npcs:
                 if npc_id in self.npcs:
                     npc = self.npcs[npc_id]
-                    print(f"   • {npc.name}: {npc.description[:50]}...")
-                    print(f"     Command: talk {npc_id}")
+                    out.append(f"   • {npc.name}: {npc.description[:50]}...")
+                    out.append(f"     Command: talk {npc_id}")
         
         # Show where you can travel
-        print("\n🚶 Where you can go:")
+        out.append("\n🚶 Where you can go:")
         
         # Sub-locations (easy travel - use 'move')
         if current_loc.sub_locations:
-            print("   📍 Nearby (sub-locations) - Use 'move':")
-            print("      These are connected areas you can walk to directly.")
+            out.append("   📍 Nearby (sub-locations) - Use 'move':")
+            out.append("      These are connected areas you can walk to directly.")
             for sub_id in current_loc.sub_locations:
                 sub = self.locations[sub_id]
-                print(f"      • {sub.name} - {sub.description[:50]}...")
-                print(f"        Command: move {sub_id}")
+                out.append(f"      • {sub.name} - {sub.description[:50]}...")
+                out.append(f"        Command: move {sub_id}")
         
         # Other accessible locations (restricted travel - use 'travel')
         accessible_locations = []
-        for loc_id, location in self.locations.items():
-            if loc_id != self.current_location and loc_id not in current_loc.sub_locations:
-                if self._can_travel_to(loc_id):
-                    accessible_locations.append((loc_id, location))
+        for loc_id in self._non_sub_accessible.get(self.current_location, []):
+            if self._can_travel_to(loc_id):
+                accessible_locations.append((loc_id, self.locations[loc_id]))
         
         if accessible_locations:
-            print("   🌍 Other locations - Use 'travel':")
-            print("      These require longer journeys and may have requirements.")
+            out.append("   🌍 Other locations - Use 'travel':")
+            out.append("      These require longer journeys and may have requirements.")
             for loc_id, location in accessible_locations:
                 requirement = self._get_travel_requirement(loc_id)
-                print(f"      • {location.name} - {location.description[:50]}...")
-                print(f"        Requirement: {requirement}")
-                print(f"        Command: travel {loc_id}")
+                out.append(f"      • {location.name} - {location.description[:50]}...")
+                out.append(f"        Requirement: {requirement}")
+                out.append(f"        Command: travel {loc_id}")
         
         if not current_loc.sub_locations and not accessible_locations:
-            print("   (No travel options available)")
-        
-        print("="*50)
-        print("💡 Travel Tips:")
-        print("   • 'move' = Quick travel to connected areas")
-        print("   • 'travel' = Longer journeys with requirements")
-        print("="*50)
+            out.append("   (No travel options available)")
+        
+        out.append("="*50)
+        out.append("💡 Travel Tips:")
+        out.append("   • 'move' = Quick travel to connected areas")
+        out.append("   • 'travel' = Longer journeys with requirements")
+        out.append("="*50)
+        sys.stdout.write("\n".join(out) + "\n")
     
     def _can_travel_to(self, location_id: str) -> bool:
         """Check if player can travel to a specific location."""
@@ -974,17 +1236,8 @@ class GameEngine:
     
     def _get_travel_requirement(self, location_id: str) -> str:
         """Get the requirement to travel to a location."""
-        # You can implement different requirements based on location
-        if location_id == "village":
-            return "Travel by road (free)"
-        elif location_id == "forest":
-            return "Walk through wilderness (free)"
-        elif location_id == "cave":
-            return "Navigate through forest (free)"
-        elif location_id == "treasure_room":
-            return "Find hidden passage (requires exploration)"
-        else:
-            return "Standard travel (free)"
+        # Add entries to _TRAVEL_REQUIREMENTS to give a location its own requirement
+        return _TRAVEL_REQUIREMENTS.get(location_id, "Standard travel (free)")
     
     def travel_to_location(self, location_id: str) -> bool:
         """Travel to a location (different from moving to sub-locations)."""
@@ -1005,24 +1258,19 @@ class GameEngine:
             return False
         
         # Remove player from current location
-        if self.player_id in current_loc.entities_within:
-            current_loc.entities_within.remove(self.player_id)
+        current_loc.entities_within.discard(self.player_id)
         
         # Add player to new location
         new_loc = self.locations[location_id]
-        if self.player_id not in new_loc.entities_within:
-            new_loc.entities_within.append(self.player_id)
+        new_loc.entities_within.add(self.player_id)
         
         self.current_location = location_id
+        self._current_location_obj = new_loc
         
         print(f"🚶 You travel to {new_loc.name}...")
         
         # Generate location image if images enabled
-        if self.images_enabled:
-            generate_game_images(self.__dict__, "location_enter", location=new_loc)
-            cached_url = image_gen.get_cached_image(f"location_{location_id}")
-            if cached_url:
-                display_image_url(cached_url, f"Welcome to {new_loc.name}!")
+        self._emit_image("location_enter", f"Welcome to {new_loc.name}!", location=new_loc)
         
         # Show scene-setting text
         self.show_scene()
@@ -1036,10 +1284,6 @@ class GameEngine:
         Create new data using AI with tool use for specific types.
         Returns True if successful, False otherwise.
         """
-        if not hasattr(self, 'ai_handler'):
-            from ai_actions import AIActionHandler
-            self.ai_handler = AIActionHandler()
-        
         try:
             print(f"   🤖 Using AI to create new {data_type}...")
             
@@ -1047,7 +1291,7 @@ class GameEngine:
             message = get_data_creation_message(user_input, data_type, game_state)
             
             # Call OpenAI with tool calling for the specific data type
-            response = self.ai_handler.client.chat.completions.create(
+            response = ai_handler.client.chat.completions.create(
                 model="gpt-4.1-nano",
                 messages=[
                     {"role": "system", "content": message},
@@ -1060,11 +1304,12 @@ class GameEngine:
             
             # Extract tool call response
             tool_call = response.choices[0].message.tool_calls[0]
-            new_data = json.loads(tool_call.function.arguments)
+            new_data = fastjson.loads(tool_call.function.arguments)
             
             # Add the new data to the game state
             if data_type == "location":
-                self.locations[new_data["id"]] = new_data
+                # Built as a Location so the travel index and map can read its sub-locations
+                self.locations[new_data["id"]] = data_loader._create_location_from_dict(new_data)
                 print(f"   📍 Created new location: {new_data['name']}")
             elif data_type == "quest":
                 self.quests[new_data["id"]] = new_data
@@ -1080,6 +1325,7 @@ class GameEngine:
                 print(f"   📋 Created new blueprint: {new_data['name']}")
             
             # Update game state
+            self._invalidate_derived_data()
             self._update_game_state()
             
             return True
@@ -1088,15 +1334,13 @@ class GameEngine:
             print(f"   ❌ Error creating new {data_type}: {e}")
             return False
 
-    def execute_immediate_action(self, user_input: str, game_state: Dict[str, Any]) -> bool:
+    def execute_immediate_action(self, user_input: str, game_state: Dict[str, Any],
+                                 apply_effects: bool = True) -> bool:
         """
         Execute an immediate action without creating or modifying data.
+        Effects are only applied when apply_effects is True (read-only actions skip them).
         Returns True if successful, False otherwise.
         """
-        if not hasattr(self, 'ai_handler'):
-            from ai_actions import AIActionHandler
-            self.ai_handler = AIActionHandler()
-        
         try:
             print("   🤖 Using AI to execute immediate action...")
             
@@ -1104,7 +1348,7 @@ class GameEngine:
             message = get_immediate_action_message(user_input, game_state)
             
             # Call OpenAI with tool calling for immediate action
-            response = self.ai_handler.client.chat.completions.create(
+            response = ai_handler.client.chat.completions.create(
                 model="gpt-4.1-nano",
                 messages=[
                     {"role": "system", "content": message},
@@ -1117,13 +1361,13 @@ class GameEngine:
             
             # Extract tool call response
             tool_call = response.choices[0].message.tool_calls[0]
-            action_result = json.loads(tool_call.function.arguments)
+            action_result = fastjson.loads(tool_call.function.arguments)
             
             # Display the result
             print(f"   {action_result['message']}")
             
             # Apply any immediate effects
-            if action_result.get('effects'):
+            if apply_effects and action_result.get('effects'):
                 self._apply_immediate_effects(action_result['effects'])
             
             return True
@@ -1135,13 +1379,14 @@ class GameEngine:
     def _apply_immediate_effects(self, effects: Dict[str, Any]):
         """Apply immediate effects from an action to the player."""
         player = self.get_player()
+        stats = player.stats
         
         if 'health_change' in effects:
-            player.stats.health = max(0, min(100, player.stats.health + effects['health_change']))
+            stats.health = max(0, min(100, stats.health + effects['health_change']))
             print(f"   💚 Health changed by {effects['health_change']}")
         
         if 'mana_change' in effects:
-            player.stats.mana = max(0, min(50, player.stats.mana + effects['mana_change']))
+            stats.mana = max(0, min(50, stats.mana + effects['mana_change']))
             print(f"   🔮 Mana changed by {effects['mana_change']}")
         
         if 'gold_change' in effects:
@@ -1161,10 +1406,6 @@ class GameEngine:
         Modify existing data using AI with comprehensive context.
         Returns True if successful, False otherwise.
         """
-        if not hasattr(self, 'ai_handler'):
-            from ai_actions import AIActionHandler
-            self.ai_handler = AIActionHandler()
-        
         try:
             print(f"   🤖 Using AI to modify existing {data_type} data...")
             
@@ -1175,7 +1416,7 @@ class GameEngine:
             message = get_data_modification_message(user_input, data_type, comprehensive_context, game_state)
             
             # Call OpenAI with tool calling for data modification
-            response = self.ai_handler.client.chat.completions.create(
+            response = ai_handler.client.chat.completions.create(
                 model="gpt-4.1-nano",
                 messages=[
                     {"role": "system", "content": message},
@@ -1188,7 +1429,7 @@ class GameEngine:
             
             # Extract tool call response
             tool_call = response.choices[0].message.tool_calls[0]
-            modification_data = json.loads(tool_call.function.arguments)
+            modification_data = fastjson.loads(tool_call.function.arguments)
             
             # Apply the modifications
             success = self._apply_data_modifications(data_type, modification_data, user_input)
@@ -1328,6 +1569,7 @@ class GameEngine:
                 print(f"   ❌ Target {data_type} with ID '{target_id}' not found")
                 return False
             
+            self._invalidate_derived_data()
             return True
             
         except Exception as e:
@@ -1336,34 +1578,37 @@ class GameEngine:
 
     def get_available_actions(self):
         """Return a list of available actions for the player at the current location."""
+        # Resolve the player and location once for every check below
+        current_loc = self.get_current_location()
+        player = self.get_player()
+        
+        # The list only changes when the player moves, learns a skill or the world changes
+        key = (self.current_location, player._version, len(self.locations))
+        if key == self._available_actions_key:
+            return self._available_actions
+        
         actions = ["status", "inventory", "skillbook", "available_quests", "map", "npcs"]
+        has_shop = bool(current_loc.shop_items)
         
         # Add shop command if current location has a shop
-        current_loc = self.get_current_location()
-        if hasattr(current_loc, 'shop_items') and current_loc.shop_items:
+        if has_shop:
             actions.append("shop")
         
         # Add move command if sub-locations exist
         if current_loc.sub_locations:
             actions.append("move <sub-location> (quick travel to connected areas)")
         
-        # Add travel command for other locations
-        accessible_locations = []
-        for loc_id, location in self.locations.items():
-            if loc_id != self.current_location and loc_id not in current_loc.sub_locations:
-                if self._can_travel_to(loc_id):
-                    accessible_locations.append(loc_id)
-        
-        if accessible_locations:
+        # Add travel command for other locations, using the same precomputed destinations as show_map
+        destinations = self._non_sub_accessible.get(self.current_location, ())
+        if any(self._can_travel_to(loc_id) for loc_id in destinations):
             actions.append("travel <location> (longer journeys with requirements)")
         
         # Only show 'use <skill>' if player has active skills
-        player = self.get_player()
-        if any(self.skills[sk].skill_type == SkillType.ACTIVE for sk in player.skills):
+        if self._has_active_skill(player):
             actions.append("use <skill>")
         
         # Add buy command if in a shop
-        if hasattr(current_loc, 'shop_items') and current_loc.shop_items:
+        if has_shop:
             actions.append("buy <item_id>")
         
         # Add talk and ask commands if NPCs are present
@@ -1371,13 +1616,15 @@ class GameEngine:
             actions.append("talk <npc_id>")
             actions.append("ask <npc_id> <question>")
         
+        self._available_actions = actions
+        self._available_actions_key = key
         return actions
 
     def print_available_actions(self):
-        actions = self.get_available_actions()
-        print("\nAvailable actions:")
-        for act in actions:
-            print(f"- {act}")
+        out = ["\nAvailable actions:"]
+        for act in self.get_available_actions():
+            out.append(f"- {act}")
+        sys.stdout.write("\n".join(out) + "\n")
 
     def gather_comprehensive_context(self, game_state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -1386,6 +1633,7 @@ class GameEngine:
         """
         player = self.get_player()
         current_location = self.get_current_location()
+        catalogs = self._data_catalogs()
         
         context = {
             "player_state": {
@@ -1409,10 +1657,10 @@ class GameEngine:
                 "name": current_location.name if current_location else None,
                 "description": current_location.description if current_location else None,
                 "scene": current_location.scene if current_location else None,
-                "npcs": current_location.npcs if current_location else [],
+                "npcs": current_location.npcs if current_location else _EMPTY_NPCS,
                 "sub_locations": current_location.sub_locations if current_location else [],
                 "shop_items": current_location.shop_items if current_location else [],
-                "entities_within": current_location.entities_within if current_location else []
+                "entities_within": list(current_location.entities_within) if current_location else []
             },
             
             "all_locations": {
@@ -1424,40 +1672,14 @@ class GameEngine:
                     "npcs": loc.npcs,
                     "sub_locations": loc.sub_locations,
                     "shop_items": loc.shop_items,
-                    "entities_within": loc.entities_within,
+                    "entities_within": list(loc.entities_within),
                     "requirements": getattr(loc, 'requirements', {})
                 }
                 for loc_id, loc in self.locations.items()
             },
             
-            "all_items": {
-                item_id: {
-                    "id": item.id,
-                    "name": item.name,
-                    "description": item.description,
-                    "cost": item.cost,
-                    "rarity": item.rarity.value if hasattr(item.rarity, 'value') else str(item.rarity),
-                    "weight": item.weight,
-                    "skill": item.skill.id if item.skill else None,
-                    "effects": getattr(item, 'effects', {}),
-                    "requirements": getattr(item, 'requirements', {})
-                }
-                for item_id, item in self.items.items()
-            },
-            
-            "all_skills": {
-                skill_id: {
-                    "id": skill.id,
-                    "name": skill.name,
-                    "description": skill.description,
-                    "skill_type": skill.skill_type.value if hasattr(skill.skill_type, 'value') else str(skill.skill_type),
-                    "target": skill.target.value if hasattr(skill.target, 'value') else str(skill.target),
-                    "range": skill.range,
-                    "area_of_effect": skill.area_of_effect,
-                    "cost": skill.cost
-                }
-                for skill_id, skill in self.skills.items()
-            },
+            "all_items": catalogs["all_items"],
+            "all_skills": catalogs["all_skills"],
             
             "all_quests": {
                 quest_id: {
@@ -1473,37 +1695,8 @@ class GameEngine:
                 for quest_id, quest in self.quests.items()
             },
             
-            "all_npcs": {
-                npc_id: {
-                    "id": npc.id,
-                    "name": npc.name,
-                    "description": npc.description,
-                    "personality": npc.personality,
-                    "location_id": npc.location_id,
-                    "level": npc.level,
-                    "conversation_id": npc.conversation_id,
-                    "quests_offered": npc.quests_offered,
-                    "shop_items": npc.shop_items,
-                    "dialogue_tree": npc.dialogue_tree,
-                    "bio": npc.bio,
-                    "conversation_nodes": [node.topic for node in getattr(npc, 'conversation_nodes', [])],
-                    "temperament": npc.temperament,
-                    "max_daily_questions": npc.max_daily_questions
-                }
-                for npc_id, npc in self.npcs.items()
-            },
-            
-            "all_blueprints": {
-                blueprint_id: {
-                    "id": blueprint.id,
-                    "name": blueprint.name,
-                    "resulting_item": blueprint.resulting_item,
-                    "required_items": blueprint.required_items,
-                    "required_skills": blueprint.required_skills,
-                    "location_needed": blueprint.location_needed
-                }
-                for blueprint_id, blueprint in self.blueprints.items()
-            },
+            "all_npcs": catalogs["all_npcs"],
+            "all_blueprints": catalogs["all_blueprints"],
             
             "game_state": {
                 "session_id": self.game_state.session_id if self.game_state else None,
@@ -1516,6 +1709,73 @@ class GameEngine:
         
         return context
 
+    def _data_catalogs(self) -> Dict[str, Any]:
+        """Item, skill, NPC and blueprint listings for the AI context; rebuilt only after game data changes."""
+        if self._catalog_context is None:
+            self._catalog_context = {
+                "all_items": {
+                    item_id: {
+                        "id": item.id,
+                        "name": item.name,
+                        "description": item.description,
+                        "cost": item.cost,
+                        "rarity": item.rarity.value if hasattr(item.rarity, 'value') else str(item.rarity),
+                        "weight": item.weight,
+                        "skill": item.skill.id if item.skill else None,
+                        "effects": getattr(item, 'effects', {}),
+                        "requirements": getattr(item, 'requirements', {})
+                    }
+                    for item_id, item in self.items.items()
+                },
+                
+                "all_skills": {
+                    skill_id: {
+                        "id": skill.id,
+                        "name": skill.name,
+                        "description": skill.description,
+                        "skill_type": skill.skill_type.value if hasattr(skill.skill_type, 'value') else str(skill.skill_type),
+                        "target": skill.target.value if hasattr(skill.target, 'value') else str(skill.target),
+                        "range": skill.range,
+                        "area_of_effect": skill.area_of_effect,
+                        "cost": skill.cost
+                    }
+                    for skill_id, skill in self.skills.items()
+                },
+                
+                "all_npcs": {
+                    npc_id: {
+                        "id": npc.id,
+                        "name": npc.name,
+                        "description": npc.description,
+                        "personality": npc.personality,
+                        "location_id": npc.location_id,
+                        "level": npc.level,
+                        "conversation_id": npc.conversation_id,
+                        "quests_offered": npc.quests_offered,
+                        "shop_items": npc.shop_items,
+                        "dialogue_tree": npc.dialogue_tree,
+                        "bio": npc.bio,
+                        "conversation_nodes": [node.topic for node in getattr(npc, 'conversation_nodes', [])],
+                        "temperament": npc.temperament,
+                        "max_daily_questions": npc.max_daily_questions
+                    }
+                    for npc_id, npc in self.npcs.items()
+                },
+                
+                "all_blueprints": {
+                    blueprint_id: {
+                        "id": blueprint.id,
+                        "name": blueprint.name,
+                        "resulting_item": blueprint.resulting_item,
+                        "required_items": blueprint.required_items,
+                        "required_skills": blueprint.required_skills,
+                        "location_needed": blueprint.location_needed
+                    }
+                    for blueprint_id, blueprint in self.blueprints.items()
+                }
+            }
+        return self._catalog_context
+    
     def validate_game_balance(self, data_type: str, target_id: str, modifications: Dict[str, Any], user_input: str) -> Tuple[bool, str, Dict[str, Any]]:
         """
         Validate that modifications don't break game balance.
@@ -1544,7 +1804,7 @@ class GameEngine:
         
         # Check if player owns this item
         player = self.get_player()
-        if target_id not in player.inventory:
+        if not player.has_item(target_id):
             return False, f"You don't own the item {item.name}", {}
         
         # Analyze the user input for ingenuity and creativity
@@ -1712,7 +1972,7 @@ class GameEngine:
         
         # Check if player has this skill
         player = self.get_player()
-        if target_id not in player.skills:
+        if not player.has_skill(target_id):
             return False, f"You don't have the skill {skill.name}", {}
         
         # Analyze ingenuity for skill modifications
@@ -1809,7 +2069,7 @@ class GameEngine:
         
         # Check if player has this quest active
         player = self.get_player()
-        if target_id not in player.quests_in_progress:
+        if not player.has_quest(target_id):
             return False, f"You don't have the quest {quest.name} active", {}
         
         # Allow some quest modifications
@@ -1894,20 +2154,22 @@ class GameEngine:
             print("📝 No changes found")
             return
         
-        print(f"📝 Change History ({len(changes)} changes):")
-        print("=" * 80)
+        out = []
+        out.append(f"📝 Change History ({len(changes)} changes):")
+        out.append("=" * 80)
         
         for change in changes:
             timestamp = change['timestamp'][:19]  # Remove microseconds
-            print(f"🕒 {timestamp}")
-            print(f"   Type: {change['data_type']}")
-            print(f"   Target: {change['target_id']}")
-            print(f"   Field: {change['field_name']}")
-            print(f"   Old: {change['old_value']}")
-            print(f"   New: {change['new_value']}")
-            print(f"   User Input: '{change['user_input']}'")
-            print(f"   Reasoning: {change['reasoning']}")
-            print("-" * 40)
+            out.append(f"🕒 {timestamp}")
+            out.append(f"   Type: {change['data_type']}")
+            out.append(f"   Target: {change['target_id']}")
+            out.append(f"   Field: {change['field_name']}")
+            out.append(f"   Old: {change['old_value']}")
+            out.append(f"   New: {change['new_value']}")
+            out.append(f"   User Input: '{change['user_input']}'")
+            out.append(f"   Reasoning: {change['reasoning']}")
+            out.append("-" * 40)
+        sys.stdout.write("\n".join(out) + "\n")
     
     def revert_last_change(self, data_type: str = None, target_id: str = None) -> bool:
         """Revert the last change made to the specified data type/target"""
@@ -1919,8 +2181,8 @@ class GameEngine:
             print("   ❌ No changes found to revert")
             return False
         
-        # Get the most recent change
-        latest_change = max(changes, key=lambda x: x.timestamp)
+        # Get the most recent change; changes within one turn share a timestamp, so rely on insertion order
+        latest_change = changes[-1]
         
         try:
             # Apply the reversion
@@ -1947,7 +2209,8 @@ class GameEngine:
                 return False
             
             # Remove the change from history
-            self.game_state.change_tracker.changes.remove(latest_change)
+            self.game_state.change_tracker.remove_change(latest_change)
+            self._invalidate_derived_data()
             
             print(f"   ✅ Reverted change: {latest_change.field_name} on {latest_change.target_id}")
             return True
@@ -1995,16 +2258,18 @@ class GameEngine:
             print("📋 No active consequences")
             return
         
-        print("📋 Active Consequences:")
-        print("=" * 50)
+        out = []
+        out.append("📋 Active Consequences:")
+        out.append("=" * 50)
         
         for consequence_id, data in consequences.items():
             if data["type"] == "item":
-                print(f"🗡️  {data['item_name']}: {data['consequence']['description']}")
+                out.append(f"🗡️  {data['item_name']}: {data['consequence']['description']}")
             elif data["type"] == "skill":
-                print(f"⚡ {data['skill_name']}: {data['consequence']['description']}")
+                out.append(f"⚡ {data['skill_name']}: {data['consequence']['description']}")
         
-        print("=" * 50)
+        out.append("=" * 50)
+        sys.stdout.write("\n".join(out) + "\n")
     
     def clear_consequence(self, item_or_skill_id: str, consequence_type: str = "item"):
         """Clear a specific consequence"""
@@ -2042,142 +2307,333 @@ class GameEngine:
         return True
 
 
+# Commands of the form "<cmd> <arg>" that map straight onto a single engine method.
+# 'move' stays in the main dispatch because it reprints the action list on success.
+SINGLE_ARG_COMMANDS = {
+    "use": GameEngine.use_skill,
+    "start": GameEngine.start_quest,
+    "travel": GameEngine.travel_to_location,
+    "buy": GameEngine.buy_item,
+    "talk": GameEngine.talk_to_npc,
+}
+
+# Commands that take no arguments and map straight onto a display method
+NO_ARG_COMMANDS = {
+    "help": GameEngine.print_available_actions,
+    "status": GameEngine.show_status,
+    "inventory": GameEngine.show_inventory,
+    "skills": GameEngine.show_skills,
+    "skillbook": GameEngine.show_skillbook,
+    "quests": GameEngine.show_available_quests,
+    "available_quests": GameEngine.show_available_quests,
+    "map": GameEngine.show_map,
+    "npcs": GameEngine.show_npcs,
+    "shop": GameEngine.show_shop,
+}
+
+# Every command word handled by the main loop's dispatch
+KNOWN_COMMANDS = frozenset(SINGLE_ARG_COMMANDS.keys() | NO_ARG_COMMANDS.keys() | {"move", "ask", "quit"})
+
+# Command words in a stable order for tab completion
+_COMMAND_WORDS = tuple(sorted(KNOWN_COMMANDS))
+
+# Typos answered with a suggestion instead of an AI round-trip: two adjacent letters swapped, like 'stauts'.
+# Fuzzier matching claimed real verbs ('stare' -> 'start', 'user' -> 'use'), and words under four
+# letters are skipped because their swaps are often words too ('use' -> 'sue').
+_COMMAND_TYPOS = {
+    word[:i] + word[i + 1] + word[i] + word[i + 2:]: word
+    for word in _COMMAND_WORDS if len(word) >= 4
+    for i in range(len(word) - 1) if word[i] != word[i + 1]
+}
+
+# Longest free-form input we'll send to the AI
+MAX_FREEFORM_INPUT_LENGTH = 500
+
+# Verbs that only observe the world; these never need an AI permission check
+SAFE_VERBS = frozenset({"look", "examine", "read", "listen", "smell", "check", "see", "observe"})
+
+# Progress lines printed on every AI-handled turn
+_MSG_PERM = "🔒 Checking permissions..."
+_MSG_DATA = "📊 Analyzing data requirements..."
+_MSG_NEW = "🆕 Creating new data..."
+_MSG_MOD = "✏️  Modifying existing data..."
+_MSG_EXEC = "⚡ Executing immediate action..."
+_MSG_DONE = "✅ Action analysis completed"
+
+# Result lines for the AI data-action branches, pre-formatted for the known data types
+_DATA_ACTION_TEMPLATES = {
+    ("create_new", True): "✅ Successfully created new {} data",
+    ("create_new", False): "❌ Failed to create new {} data",
+    ("modify_existing", True): "✅ Successfully modified existing {} data",
+    ("modify_existing", False): "❌ Failed to modify existing {} data",
+}
+_DATA_ACTION_MESSAGES = {
+    (action_type, data_type, success): template.format(data_type)
+    for (action_type, success), template in _DATA_ACTION_TEMPLATES.items()
+    for data_type in ("location", "quest", "item", "npc", "skill", "blueprint")
+}
+
+
+def _data_action_message(action_type: str, data_type: str, success: bool) -> str:
+    """Return the result line for a create/modify data action."""
+    message = _DATA_ACTION_MESSAGES.get((action_type, data_type, success))
+    if message is None:
+        message = _DATA_ACTION_TEMPLATES[(action_type, success)].format(data_type)
+    return message
+
+
+def _read_command() -> str:
+    """Read one line of player input, using buffered stdin when input is piped from a script."""
+    if sys.stdin.isatty():
+        return input("\n> ")
+    # Show the same prompt input() would, so piped transcripts still mark each command
+    sys.stdout.write("\n> ")
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line
+
+
+def _completion_candidates(game: GameEngine, words: List[str]) -> Iterable[str]:
+    """Words that can follow the ones already typed: command words first, then the ID each command takes."""
+    if not words:
+        return _COMMAND_WORDS
+    if len(words) > 1:
+        return ()
+    cmd = words[0].lower()
+    location = game.get_current_location()
+    if cmd == "move":
+        return location.sub_locations
+    if cmd == "travel":
+        return game._non_sub_accessible.get(game.current_location, ())
+    if cmd == "use":
+        return game.get_player().skills
+    if cmd == "start":
+        return location.quests
+    if cmd == "buy":
+        return location.shop_items
+    if cmd in ("talk", "ask"):
+        return location.npcs
+    return ()
+
+
+def _make_completer(game: GameEngine, readline) -> Callable[[str, int], Optional[str]]:
+    """Build a readline completer over command words and the IDs valid at the player's location."""
+    matches: List[str] = []
+    
+    def complete(text: str, state: int) -> Optional[str]:
+        if state == 0:
+            words = readline.get_line_buffer()[:readline.get_begidx()].split()
+            prefix = text.lower()
+            matches[:] = sorted(c for c in _completion_candidates(game, words) if c.startswith(prefix))
+        return matches[state] if state < len(matches) else None
+    
+    return complete
+
+
+class _RepeatSuppressor:
+    """Print messages, collapsing long runs of the same message into one summary line."""
+    
+    def __init__(self, limit: int = 3):
+        self.limit = limit
+        self.last_msg: Optional[str] = None
+        self.count = 0
+    
+    def emit(self, msg: str):
+        """Print msg unless it has already been printed `limit` times in a row."""
+        if msg == self.last_msg:
+            self.count += 1
+            if self.count > self.limit:
+                return
+        else:
+            self.flush()
+            self.last_msg = msg
+            self.count = 1
+        print(msg)
+    
+    def flush(self):
+        """Report any suppressed repeats and start a new run."""
+        if self.count > self.limit:
+            print(f"...(repeated {self.count - self.limit} more times)")
+        self.last_msg = None
+        self.count = 0
+
+
+def _say_goodbye(game: GameEngine, farewell: str):
+    """Print the farewell message while the image log is exported on a background thread."""
+    exporter = None
+    if game._image_executor is not None:
+        # Let an in-flight image finish, but drop anything still queued
+        game._image_executor.shutdown(wait=False, cancel_futures=True)
+    if game.images_enabled:
+        from image import image_gen
+        exporter = threading.Thread(target=image_gen.export_image_log)
+        exporter.start()
+    print(farewell)
+    if exporter:
+        exporter.join(timeout=5.0)
+        if exporter.is_alive():
+            print("(image log still flushing in background...)")
+
+
+def _player_permitted(user_input: str, game_state_dict: Dict[str, Any]) -> bool:
+    """Ask the AI whether the player may do this, reporting any refusal."""
+    print(_MSG_PERM)
+    permission = ai_handler.check_player_permission(user_input, game_state_dict)
+    if not permission['allowed']:
+        print(f"❌ {permission['reasoning']}")
+        if permission['restricted_effects']:
+            print(f"   Restricted effects: {', '.join(permission['restricted_effects'])}")
+        return False
+    return True
+
+
+def _handle_freeform_input(game: GameEngine, user_input: str, cmd: str):
+    """Use AI to analyze and execute an action that isn't a built-in command."""
+    current_location = game.get_current_location()
+    player = game.get_player()
+    stats = player.stats
+    game_state_dict = {
+        "player_location": game.current_location,
+        "player_health": stats.health,
+        "player_mana": stats.mana,
+        "player_gold": player.gold,
+        "player_level": stats.level,
+        "active_quests": player.quests_in_progress,
+        "inventory": player.inventory,
+        "location_npcs": current_location.npcs if current_location else _EMPTY_NPCS,
+        "location_description": current_location.description if current_location else "Unknown location"
+    }
+
+    # Step 1: Check if player should be allowed to do this. Read-only verbs defer the
+    # check until we know whether the chosen action would change game data.
+    read_only = cmd in SAFE_VERBS
+    if not read_only and not _player_permitted(user_input, game_state_dict):
+        return
+
+    # Step 2: Determine if this should create new data or modify existing data
+    print(_MSG_DATA)
+    data_action = ai_handler.determine_data_action(user_input, game_state_dict)
+    action_type = data_action['action_type']
+    data_type = data_action['data_type']
+    print(f"   Action type: {action_type}")
+    print(f"   Data type: {data_type}")
+    print(f"   Reasoning: {data_action['reasoning']}")
+
+    # A read-only verb that resolves to a data change still needs permission
+    if read_only and action_type in ('create_new', 'modify_existing'):
+        if not _player_permitted(user_input, game_state_dict):
+            return
+
+    # Step 3: Execute based on data action type, sharing the same state dict with every step
+    if action_type == 'create_new':
+        print(_MSG_NEW)
+        success = game.create_new_data(user_input, data_type, game_state_dict)
+        print(_data_action_message(action_type, data_type, success))
+
+    elif action_type == 'modify_existing':
+        print(_MSG_MOD)
+        success = game.modify_existing_data(user_input, data_type, game_state_dict)
+        print(_data_action_message(action_type, data_type, success))
+
+    else:  # immediate action
+        print(_MSG_EXEC)
+        success = game.execute_immediate_action(user_input, game_state_dict, apply_effects=not read_only)
+        if success:
+            print("✅ Immediate action executed successfully")
+        else:
+            print("❌ Failed to execute immediate action")
+
+    print(_MSG_DONE)
+
+
 def main():
     """Main game loop"""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     game = GameEngine()
     
+    # Enable line editing, history and tab completion for interactive sessions; completing
+    # commands and IDs keeps typos from falling through to the AI
+    try:
+        import readline
+        readline.set_history_length(1000)
+        readline.set_completer(_make_completer(game, readline))
+        if "libedit" in (readline.__doc__ or ""):
+            readline.parse_and_bind("bind ^I rl_complete")
+        else:
+            readline.parse_and_bind("tab: complete")
+    except ImportError:
+        pass
+    
+    atexit.register(game.flush_state)
+    
     print("Welcome to DND Adventure!")
     game.print_available_actions()
+    repeats = _RepeatSuppressor()
     
     while True:
         try:
-            user_input = input("\n> ").strip()
+            user_input = _read_command().strip()
             if not user_input:
                 continue
+            TICK_CLOCK.tick()
                         
-            command = user_input.lower().split()
+            command = user_input.split()
             if not command:
                 continue
             
-            cmd = command[0]
+            # Command words are interned so dispatch-table lookups can match on identity
+            cmd = sys.intern(command[0].lower())
             
             # Set available actions for AI handler
             available_actions = game.get_available_actions()
-            ai_handler.set_available_actions(available_actions)
-            
-            if cmd == "help":
-                game.print_available_actions()
-            elif cmd == "status":
-                game.show_status()
-            elif cmd == "inventory":
-                game.show_inventory()
-            elif cmd == "skills":
-                game.show_skills()
-            elif cmd == "skillbook":
-                game.show_skillbook()
-            elif cmd == "quests":
-                game.show_available_quests()
-            elif cmd == "available_quests":
-                game.show_available_quests()
-            elif cmd == "map":
-                game.show_map()
-            elif cmd == "npcs":
-                game.show_npcs()
+            if available_actions is not ai_handler.available_actions:
+                ai_handler.set_available_actions(available_actions)
+            
+            # Anything that isn't a built-in command goes straight to the AI,
+            # unless it's obvious noise that isn't worth an AI round-trip
+            if cmd not in KNOWN_COMMANDS:
+                if len(cmd) < 2 or cmd.isdigit() or len(user_input) > MAX_FREEFORM_INPUT_LENGTH:
+                    repeats.emit("I don't understand that command. Type 'help' for options.")
+                    continue
+                # A near-miss of a built-in command is a typo, not something worth an AI round-trip
+                suggestion = _COMMAND_TYPOS.get(cmd)
+                if suggestion:
+                    repeats.emit(f"Did you mean '{suggestion}'? Type 'help' for options.")
+                    continue
+                repeats.flush()
+                _handle_freeform_input(game, user_input, cmd)
+                continue
+            
+            repeats.flush()
+            
+            # Data IDs are all lowercase; only the free text of 'ask' keeps the player's casing
+            handler = SINGLE_ARG_COMMANDS.get(cmd)
+            if handler and len(command) > 1:
+                handler(game, command[1].lower())
+            elif cmd in NO_ARG_COMMANDS:
+                NO_ARG_COMMANDS[cmd](game)
             elif cmd == "move" and len(command) > 1:
-                location = command[1]
+                location = command[1].lower()
                 if game.move_to_location(location):
                     game.print_available_actions()
-            elif cmd == "use" and len(command) > 1:
-                skill = command[1]
-                game.use_skill(skill)
-            elif cmd == "start" and len(command) > 1:
-                quest = command[1]
-                game.start_quest(quest)
-            elif cmd == "travel" and len(command) > 1:
-                location = command[1]
-                game.travel_to_location(location)
-            elif cmd == "shop":
-                game.show_shop()
-            elif cmd == "buy" and len(command) > 1:
-                item_id = command[1]
-                game.buy_item(item_id)
-            elif cmd == "talk" and len(command) > 1:
-                npc_id = command[1]
-                game.talk_to_npc(npc_id)
             elif cmd == "ask" and len(command) > 2:
-                npc_id = command[1]
+                npc_id = command[1].lower()
                 question = " ".join(command[2:])
                 game.talk_to_npc(npc_id, question)
             elif cmd == "quit":
-                if game.images_enabled:
-                    image_gen.export_image_log()
-                print("Thanks for playing!")
+                _say_goodbye(game, "Thanks for playing!")
                 break
             else:
-                # Use AI to analyze and execute the action immediately
-                current_location = game.get_current_location()
-                game_state_dict = {
-                    "player_location": game.current_location,
-                    "player_health": game.get_player().stats.health,
-                    "player_mana": game.get_player().stats.mana,
-                    "player_gold": game.get_player().gold,
-                    "player_level": game.get_player().stats.level,
-                    "active_quests": game.get_player().quests_in_progress,
-                    "inventory": game.get_player().inventory,
-                    "location_npcs": current_location.npcs if current_location else [],
-                    "location_description": current_location.description if current_location else "Unknown location"
-                }
-                
-                # Step 1: Check if player should be allowed to do this
-                print("🔒 Checking permissions...")
-                permission = ai_handler.check_player_permission(user_input, game_state_dict)
-                
-                if not permission['allowed']:
-                    print(f"❌ {permission['reasoning']}")
-                    if permission['restricted_effects']:
-                        print(f"   Restricted effects: {', '.join(permission['restricted_effects'])}")
-                    continue
-                
-                # Step 2: Determine if this should create new data or modify existing data
-                print("📊 Analyzing data requirements...")
-                data_action = ai_handler.determine_data_action(user_input, game_state_dict)
-                print(f"   Action type: {data_action['action_type']}")
-                print(f"   Data type: {data_action['data_type']}")
-                print(f"   Reasoning: {data_action['reasoning']}")
-                
-                # Step 3: Execute based on data action type
-                if data_action['action_type'] == 'create_new':
-                    print("🆕 Creating new data...")
-                    success = game.create_new_data(user_input, data_action['data_type'], game_state_dict)
-                    if success:
-                        print(f"✅ Successfully created new {data_action['data_type']} data")
-                    else:
-                        print(f"❌ Failed to create new {data_action['data_type']} data")
-                    
-                elif data_action['action_type'] == 'modify_existing':
-                    print("✏️  Modifying existing data...")
-                    success = game.modify_existing_data(user_input, data_action['data_type'], game_state_dict)
-                    if success:
-                        print(f"✅ Successfully modified existing {data_action['data_type']} data")
-                    else:
-                        print(f"❌ Failed to modify existing {data_action['data_type']} data")
-                    
-                else:  # immediate action
-                    print("⚡ Executing immediate action...")
-                    success = game.execute_immediate_action(user_input, game_state_dict)
-                    if success:
-                        print("✅ Immediate action executed successfully")
-                    else:
-                        print("❌ Failed to execute immediate action")
-                
-                print("✅ Action analysis completed")
-        except KeyboardInterrupt:
-            if game.images_enabled:
-                image_gen.export_image_log()
-            print("\nThanks for playing!")
+                _handle_freeform_input(game, user_input, cmd)
+        except (KeyboardInterrupt, EOFError):
+            repeats.flush()
+            _say_goodbye(game, "\nThanks for playing!")
             break
-        except Exception as e:
-            print(f"Error: {e}")
+        except Exception:
+            log.exception("Error: command failed")
 
 
 if __name__ == "__main__":
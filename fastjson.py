@@ -0,0 +1,36 @@
+"""
+JSON helpers that use orjson when it is installed and fall back to the stdlib json module.
+Both paths work in bytes so callers can read and write files in binary mode.
+"""
+
+from typing import Any, Union
+
+try:
+    import orjson
+
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        """Serialize obj to JSON bytes"""
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_DATACLASS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+
+    loads = orjson.loads
+
+except ImportError:
+    import json
+    from dataclasses import fields, is_dataclass
+
+    def _default(obj: Any) -> Any:
+        """Serialize dataclasses the way orjson does: public fields in definition order"""
+        if is_dataclass(obj) and not isinstance(obj, type):
+            return {f.name: getattr(obj, f.name) for f in fields(obj) if not f.name.startswith("_")}
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        """Serialize obj to JSON bytes"""
+        return json.dumps(obj, indent=2 if indent else None, default=_default).encode("utf-8")
+
+    def loads(data: Union[bytes, str]) -> Any:
+        """Deserialize JSON bytes or text"""
+        return json.loads(data)
@@ -1,9 +1,66 @@
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any, Tuple
+from dataclasses import MISSING, dataclass, field, fields
+from typing import ClassVar, Deque, List, Optional, Dict, Any, Tuple, Set
 from enum import Enum
+from collections import deque
+from functools import partial
+from operator import attrgetter
 from datetime import datetime, timedelta
-import json
+import os
+import pickle
+import sys
 import uuid
+import fastjson
+
+# Maximum entries kept per NPC in GameState.conversation_history
+CONVERSATION_HISTORY_LIMIT = 50
+
+# Delta log key for journaled AI action changes: action ID -> action dict, or None when removed
+AI_ACTION_DELTA_KEY = "ai_generated_actions_delta"
+
+
+def _fast_pickle(cls):
+    """Give a slotted dataclass tuple-based __getstate__/__setstate__ compiled for its fields"""
+    names = [f"self.{f.name}" for f in fields(cls)]
+    targets = ", ".join(names) + ","
+    source = (
+        f"def __getstate__(self):\n    return ({targets})\n"
+        f"def __setstate__(self, state):\n    {targets} = state\n"
+    )
+    namespace = {}
+    exec(source, {}, namespace)
+    for name in ("__getstate__", "__setstate__"):
+        hook = namespace[name]
+        hook.__qualname__ = f"{cls.__qualname__}.{name}"
+        setattr(cls, name, hook)
+    return cls
+
+
+def _cache_fields(cls):
+    """Record a dataclass's public field names as _FIELD_NAMES so to_dict need not call fields() per object"""
+    cls._FIELD_NAMES = tuple(f.name for f in fields(cls) if not f.name.startswith("_"))
+    return cls
+
+
+class _TickClock:
+    """Wall-clock time sampled once per game turn, so timestamps made during a turn share one reading"""
+    __slots__ = ("_now", "_iso")
+    
+    def __init__(self):
+        self.tick()
+    
+    def tick(self):
+        """Take a fresh reading; called at the start of each turn"""
+        self._now = datetime.now()
+        self._iso = self._now.isoformat()
+    
+    def now(self) -> datetime:
+        return self._now
+    
+    def iso(self) -> str:
+        return self._iso
+
+
+TICK_CLOCK = _TickClock()
 
 
 class Rarity(Enum):
@@ -43,7 +100,8 @@ class QuestObjectiveType(Enum):
     CRAFT = "craft"
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class Skill:
     id: str
     name: str
@@ -55,7 +113,8 @@ class Skill:
     cost: int
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class Item:
     id: str
     name: str
@@ -66,7 +125,8 @@ class Item:
     skill: Optional[Skill] = None
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class Objective:
     id: str
     description: str
@@ -75,12 +135,13 @@ class Objective:
     current_count: int = 0
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class Location:
     id: str
     name: str
     description: str
-    entities_within: List[str] = field(default_factory=list)
+    entities_within: Set[str] = field(default_factory=set)
     sub_locations: List[str] = field(default_factory=list)
     quests: List[str] = field(default_factory=list)
     scene: Optional[str] = None
@@ -91,7 +152,8 @@ class Location:
     npcs: List[str] = field(default_factory=list)
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class Blueprint:
     id: str
     name: str
@@ -101,7 +163,8 @@ class Blueprint:
     location_needed: Optional[str] = None
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class DialogueInstance:
     id: str
     text: str
@@ -111,14 +174,17 @@ class DialogueInstance:
     action: Optional[str] = None
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class Conversation:
     id: str
     root_dialogue: str
     dialogue_list: List[str] = field(default_factory=list)
 
 
-@dataclass
+@_cache_fields
+@_fast_pickle
+@dataclass(slots=True)
 class Stats:
     health: int
     max_health: int
@@ -132,9 +198,14 @@ class Stats:
     charisma: int
     level: int
     experience: int
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization"""
+        return {name: getattr(self, name) for name in self._FIELD_NAMES}
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class Entity:
     id: str
     name: str
@@ -145,9 +216,60 @@ class Entity:
     quests_in_progress: List[str] = field(default_factory=list)
     lore: Dict[str, Any] = field(default_factory=dict)
     gold: int = 100
+    # Set mirrors of the lists above for O(1) membership tests; lists keep display order
+    _inventory_set: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    _skills_set: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    _quests_set: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    # Bumped whenever the inventory, skills or quests change, so caches can tell a stale list from a current one
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._inventory_set = set(self.inventory)
+        self._skills_set = set(self.skills)
+        self._quests_set = set(self.quests_in_progress)
+    
+    def has_item(self, item_id: str) -> bool:
+        """Check if the item is in the inventory"""
+        return item_id in self._inventory_set
+    
+    def add_item(self, item_id: str, stack: bool = False) -> bool:
+        """Add an item to the inventory; duplicates are only added when stack is True"""
+        if not stack and item_id in self._inventory_set:
+            return False
+        self._inventory_set.add(item_id)
+        self.inventory.append(item_id)
+        self._version += 1
+        return True
+    
+    def has_skill(self, skill_id: str) -> bool:
+        """Check if the skill has been learned"""
+        return skill_id in self._skills_set
+    
+    def learn_skill(self, skill_id: str) -> bool:
+        """Learn a skill, returning False if it was already known"""
+        if skill_id in self._skills_set:
+            return False
+        self._skills_set.add(skill_id)
+        self.skills.append(skill_id)
+        self._version += 1
+        return True
+    
+    def has_quest(self, quest_id: str) -> bool:
+        """Check if the quest is in progress"""
+        return quest_id in self._quests_set
+    
+    def add_quest(self, quest_id: str) -> bool:
+        """Track a quest as in progress, returning False if it already was"""
+        if quest_id in self._quests_set:
+            return False
+        self._quests_set.add(quest_id)
+        self.quests_in_progress.append(quest_id)
+        self._version += 1
+        return True
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class ConversationNode:
     """Represents a conversation topic or thread"""
     topic: str
@@ -157,20 +279,27 @@ class ConversationNode:
     player_relationship_impact: int = 0
     created_dynamically: bool = False
     related_data_modifications: List[Dict[str, Any]] = field(default_factory=list)
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    created_at: str = field(default_factory=TICK_CLOCK.iso)
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class DynamicExchange:
     """Represents a dynamic conversation exchange"""
     player_input: str
     npc_response: str
     similarity_score: float
     is_essential: bool
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    created_at: str = field(default_factory=TICK_CLOCK.iso)
 
 
-@dataclass
+# Serialized DynamicExchange keys, fetched in one call when building GameState.to_dict
+_EXCHANGE_FIELDS = tuple(f.name for f in fields(DynamicExchange))
+_get_exchange_fields = attrgetter(*_EXCHANGE_FIELDS)
+
+
+@_fast_pickle
+@dataclass(slots=True)
 class ConversationState:
     """Tracks conversation state for an NPC"""
     npc_id: str
@@ -178,10 +307,11 @@ class ConversationState:
     essential_topics_created: List[str] = field(default_factory=list)
     relationship_level: int = 0
     max_questions_remaining: int = 10
-    last_interaction: str = field(default_factory=lambda: datetime.now().isoformat())
+    last_interaction: str = field(default_factory=TICK_CLOCK.iso)
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class NPC:
     id: str
     name: str
@@ -199,7 +329,8 @@ class NPC:
     max_daily_questions: int = 10  # Maximum questions player can ask per day
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class QuestObjective:
     id: str
     description: str
@@ -210,19 +341,22 @@ class QuestObjective:
     target_id: Optional[str] = None
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class Quest:
     id: str
     name: str
     description: str
     level: int
-    objectives: List[QuestObjective]
+    objectives: List[Objective]
     reward: Dict[str, Any]
     status: QuestStatus = QuestStatus.NOT_STARTED
     location_id: Optional[str] = None
 
 
-@dataclass
+@_cache_fields
+@_fast_pickle
+@dataclass(slots=True)
 class Action:
     """A flexible action primitive that can handle any type of game action"""
     id: str
@@ -238,24 +372,42 @@ class Action:
     cooldown: Optional[int] = None  # Cooldown period before action can be used again
     success_chance: float = 1.0  # Probability of success (0.0 to 1.0)
     ai_generated: bool = False  # Whether this action was created by AI
+    # Cost and effect keys execute applies, in order; selects the compiled function from _EXECUTE_FUNCTIONS
+    _execute_shape: Tuple[Tuple[str, ...], Tuple[str, ...]] = field(default=((), ()), init=False, repr=False, compare=False)
+    # (resource, getter, amount) for the costs that can_perform has to check the player can afford
+    _cost_checks: List[Tuple[str, Any, int]] = field(default_factory=list, init=False, repr=False, compare=False)
+    # requirements unpacked in __post_init__ so can_perform reads slots instead of probing the dict
+    _required_level: int = field(default=0, init=False, repr=False, compare=False)
+    _required_items: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    _required_skills: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    _required_location: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Action types and effect/cost keys come from small vocabularies; share one string object each
+        self.action_type = sys.intern(self.action_type)
+        self.effects = {sys.intern(k): v for k, v in self.effects.items()}
+        self.cost = {sys.intern(k): v for k, v in self.cost.items()}
+        self.requirements = requirements = {sys.intern(k): v for k, v in self.requirements.items()}
+        self._required_level = requirements.get("level", 0)
+        # Required ids are looked up in the player's sets on every check; share one string object each
+        self._required_items = tuple(sys.intern(item_id) for item_id in requirements.get("items", ()))
+        self._required_skills = tuple(sys.intern(skill_id) for skill_id in requirements.get("skills", ()))
+        required_location = requirements.get("location")
+        self._required_location = sys.intern(required_location) if required_location is not None else None
+        # Effects and costs are fixed once the action exists, so resolve their handlers up front
+        self._execute_shape = (
+            tuple(resource for resource in self.cost if resource in _COST_HANDLERS),
+            tuple(effect_type for effect_type in self.effects if effect_type in _EFFECT_HANDLERS),
+        )
+        self._cost_checks = [
+            (resource, _COST_RESOURCE_GETTERS[resource], amount)
+            for resource, amount in self.cost.items()
+            if resource in _COST_RESOURCE_GETTERS
+        ]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "action_type": self.action_type,
-            "parameters": self.parameters,
-            "targets": self.targets,
-            "requirements": self.requirements,
-            "effects": self.effects,
-            "cost": self.cost,
-            "duration": self.duration,
-            "cooldown": self.cooldown,
-            "success_chance": self.success_chance,
-            "ai_generated": self.ai_generated
-        }
+        return {name: getattr(self, name) for name in self._FIELD_NAMES}
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Action':
@@ -264,193 +416,282 @@ class Action:
     
     def can_perform(self, player: 'Entity', game_state: 'GameState') -> Tuple[bool, str]:
         """Check if the action can be performed by the player"""
+        reason = self._unmet_requirement(player, game_state)
+        if reason is not None:
+            return False, reason
+        return True, "Action can be performed"
+    
+    def _unmet_requirement(self, player: 'Entity', game_state: 'GameState') -> Optional[str]:
+        """Return the reason the action cannot be performed, or None if the player meets every requirement"""
         # Check level requirement
-        if "level" in self.requirements:
-            if player.stats.level < self.requirements["level"]:
-                return False, f"Requires level {self.requirements['level']}"
+        if player.stats.level < self._required_level:
+            return f"Requires level {self._required_level}"
         
         # Check resource costs
-        for resource, amount in self.cost.items():
-            if resource == "mana" and player.stats.mana < amount:
-                return False, f"Not enough mana (need {amount}, have {player.stats.mana})"
-            elif resource == "health" and player.stats.health < amount:
-                return False, f"Not enough health (need {amount}, have {player.stats.health})"
-            elif resource == "gold" and player.gold < amount:
-                return False, f"Not enough gold (need {amount}, have {player.gold})"
+        for resource, available, amount in self._cost_checks:
+            have = available(player)
+            if have < amount:
+                return f"Not enough {resource} (need {amount}, have {have})"
         
         # Check item requirements
-        if "items" in self.requirements:
-            for item_id in self.requirements["items"]:
-                if item_id not in player.inventory:
-                    return False, f"Missing required item: {item_id}"
+        for item_id in self._required_items:
+            if not player.has_item(item_id):
+                return f"Missing required item: {item_id}"
         
         # Check skill requirements
-        if "skills" in self.requirements:
-            for skill_id in self.requirements["skills"]:
-                if skill_id not in player.skills:
-                    return False, f"Missing required skill: {skill_id}"
+        for skill_id in self._required_skills:
+            if not player.has_skill(skill_id):
+                return f"Missing required skill: {skill_id}"
         
         # Check location requirements
-        if "location" in self.requirements:
-            if game_state.player_location != self.requirements["location"]:
-                return False, f"Must be at {self.requirements['location']}"
+        if self._required_location is not None and game_state.player_location != self._required_location:
+            return f"Must be at {self._required_location}"
         
-        return True, "Action can be performed"
+        return None
     
     def execute(self, player: 'Entity', game_state: 'GameState', **kwargs) -> Tuple[bool, str]:
         """Execute the action and return (success, message)"""
-        # Check if action can be performed
-        can_perform, message = self.can_perform(player, game_state)
-        if not can_perform:
-            return False, message
-        
-        # Apply resource costs
-        for resource, amount in self.cost.items():
-            if resource == "mana":
-                player.stats.mana -= amount
-            elif resource == "health":
-                player.stats.health -= amount
-            elif resource == "gold":
-                player.gold -= amount
-            elif resource == "stamina":
-                # Stamina as a percentage of max health
-                stamina_cost = int(player.stats.max_health * (amount / 100))
-                player.stats.health = max(1, player.stats.health - stamina_cost)
-        
-        # Apply effects
-        for effect_type, effect_data in self.effects.items():
-            if effect_type == "heal":
-                heal_amount = effect_data.get("amount", 0)
-                player.stats.health = min(player.stats.max_health, player.stats.health + heal_amount)
-            elif effect_type == "restore_mana":
-                mana_amount = effect_data.get("amount", 0)
-                player.stats.mana = min(player.stats.max_mana, player.stats.mana + mana_amount)
-            elif effect_type == "add_gold":
-                gold_amount = effect_data.get("amount", 0)
-                player.gold += gold_amount
-            elif effect_type == "add_experience":
-                exp_amount = effect_data.get("amount", 0)
-                player.stats.experience += exp_amount
-            elif effect_type == "add_item":
-                item_id = effect_data.get("item_id")
-                if item_id and item_id not in player.inventory:
-                    player.inventory.append(item_id)
-            elif effect_type == "learn_skill":
-                skill_id = effect_data.get("skill_id")
-                if skill_id and skill_id not in player.skills:
-                    player.skills.append(skill_id)
-            elif effect_type == "move_to":
-                new_location = effect_data.get("location_id")
-                if new_location:
-                    game_state.player_location = new_location
-            elif effect_type == "teleport_to":
-                new_location = effect_data.get("location_id")
-                if new_location:
-                    game_state.player_location = new_location
-            elif effect_type == "unlock_location":
-                location_id = effect_data.get("location_id")
-                if location_id and location_id not in game_state.discovered_locations:
-                    game_state.discovered_locations.append(location_id)
-            elif effect_type == "improve_relationship":
-                npc_id = effect_data.get("npc_id")
-                amount = effect_data.get("amount", 1)
-                if npc_id:
-                    current_relationship = game_state.npc_relationships.get(npc_id, 0)
-                    game_state.npc_relationships[npc_id] = current_relationship + amount
-            elif effect_type == "gain_reputation":
-                amount = effect_data.get("amount", 1)
-                # Store reputation in temporary effects
-                current_reputation = game_state.temporary_effects.get("reputation", 0)
-                game_state.temporary_effects["reputation"] = current_reputation + amount
-            elif effect_type == "unlock_dialogue":
-                dialogue_id = effect_data.get("dialogue_id")
-                if dialogue_id:
-                    if "unlocked_dialogues" not in game_state.temporary_effects:
-                        game_state.temporary_effects["unlocked_dialogues"] = []
-                    game_state.temporary_effects["unlocked_dialogues"].append(dialogue_id)
-            elif effect_type == "change_weather":
-                weather = effect_data.get("weather", "clear")
-                game_state.temporary_effects["weather"] = weather
-            elif effect_type == "create_light":
-                duration = effect_data.get("duration", 10)
-                game_state.temporary_effects["light_source"] = duration
-            elif effect_type == "open_secret_passage":
-                passage_id = effect_data.get("passage_id")
-                if passage_id:
-                    if "open_passages" not in game_state.temporary_effects:
-                        game_state.temporary_effects["open_passages"] = []
-                    game_state.temporary_effects["open_passages"].append(passage_id)
-            elif effect_type == "invisibility":
-                duration = effect_data.get("duration", 5)
-                game_state.temporary_effects["invisible"] = duration
-            elif effect_type == "flight":
-                duration = effect_data.get("duration", 3)
-                game_state.temporary_effects["flying"] = duration
-            elif effect_type == "enhanced_senses":
-                duration = effect_data.get("duration", 10)
-                game_state.temporary_effects["enhanced_senses"] = duration
-            elif effect_type == "protection":
-                duration = effect_data.get("duration", 5)
-                protection_type = effect_data.get("type", "general")
-                game_state.temporary_effects[f"protection_{protection_type}"] = duration
-            elif effect_type == "unlock_ability":
-                ability_id = effect_data.get("ability_id")
-                if ability_id:
-                    if "unlocked_abilities" not in game_state.temporary_effects:
-                        game_state.temporary_effects["unlocked_abilities"] = []
-                    game_state.temporary_abilities.append(ability_id)
-            elif effect_type == "gain_title":
-                title = effect_data.get("title", "Adventurer")
-                game_state.temporary_effects["title"] = title
-            elif effect_type == "establish_connection":
-                connection_type = effect_data.get("type", "general")
-                target = effect_data.get("target", "unknown")
-                game_state.temporary_effects[f"connection_{connection_type}"] = target
-            elif effect_type == "trigger_event":
-                event_id = effect_data.get("event_id")
-                if event_id:
-                    game_state.world_events.append({
-                        "id": event_id,
-                        "triggered_by": self.id,
-                        "timestamp": game_state.timestamp
-                    })
-            elif effect_type == "reveal_secret":
-                secret_id = effect_data.get("secret_id")
-                if secret_id:
-                    if "revealed_secrets" not in game_state.temporary_effects:
-                        game_state.temporary_effects["revealed_secrets"] = []
-                    game_state.temporary_effects["revealed_secrets"].append(secret_id)
-            elif effect_type == "advance_quest":
-                quest_id = effect_data.get("quest_id")
-                if quest_id and quest_id in player.quests_in_progress:
-                    # Mark quest as advanced
-                    if "advanced_quests" not in game_state.temporary_effects:
-                        game_state.temporary_effects["advanced_quests"] = []
-                    game_state.temporary_effects["advanced_quests"].append(quest_id)
-            elif effect_type == "create_art":
-                art_type = effect_data.get("type", "painting")
-                value = effect_data.get("value", 10)
-                game_state.temporary_effects[f"created_art_{art_type}"] = value
-            elif effect_type == "compose_song":
-                song_type = effect_data.get("type", "ballad")
-                game_state.temporary_effects[f"composed_song_{song_type}"] = True
-            elif effect_type == "write_story":
-                story_type = effect_data.get("type", "tale")
-                game_state.temporary_effects[f"written_story_{story_type}"] = True
-            elif effect_type == "damage_enemy":
-                # This would be handled in combat context
-                pass
-            elif effect_type == "buff_ally":
-                # This would be handled in combat context
-                pass
-            elif effect_type == "debuff_enemy":
-                # This would be handled in combat context
-                pass
-        
-        return True, f"Successfully performed {self.name}"
+        # Validation, costs and effects run in a function generated once per action shape
+        shape = self._execute_shape
+        compiled = _EXECUTE_FUNCTIONS.get(shape) or _compile_execute(shape)
+        return compiled(self, player, game_state)
+
+
+# Resource cost handlers for Action.execute, keyed by cost resource
+def _cost_mana(player: Entity, amount: int):
+    player.stats.mana -= amount
+
+
+def _cost_health(player: Entity, amount: int):
+    player.stats.health -= amount
+
+
+def _cost_gold(player: Entity, amount: int):
+    player.gold -= amount
+
+
+def _cost_stamina(player: Entity, amount: int):
+    # Stamina as a percentage of max health
+    stats = player.stats
+    stamina_cost = int(stats.max_health * (amount / 100))
+    stats.health = max(1, stats.health - stamina_cost)
+
+
+_COST_HANDLERS = {
+    "mana": _cost_mana,
+    "health": _cost_health,
+    "gold": _cost_gold,
+    "stamina": _cost_stamina,
+}
+
+# Where can_perform reads the player's current amount of each resource it checks; stamina is not checked
+_COST_RESOURCE_GETTERS = {
+    "mana": attrgetter("stats.mana"),
+    "health": attrgetter("stats.health"),
+    "gold": attrgetter("gold"),
+}
+
+
+# Effect handlers for Action.execute, keyed by effect type
+def _effect_heal(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    stats = player.stats
+    stats.health = min(stats.max_health, stats.health + effect_data.get("amount", 0))
+
+
+def _effect_restore_mana(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    stats = player.stats
+    stats.mana = min(stats.max_mana, stats.mana + effect_data.get("amount", 0))
+
+
+def _effect_add_gold(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    player.gold += effect_data.get("amount", 0)
+
+
+def _effect_add_experience(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    player.stats.experience += effect_data.get("amount", 0)
+
+
+def _effect_add_item(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    item_id = effect_data.get("item_id")
+    if item_id:
+        player.add_item(item_id)
+
+
+def _effect_learn_skill(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    skill_id = effect_data.get("skill_id")
+    if skill_id:
+        player.learn_skill(skill_id)
+
+
+def _effect_move_to(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    new_location = effect_data.get("location_id")
+    if new_location:
+        game_state.player_location = new_location
+
+
+def _effect_unlock_location(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    location_id = effect_data.get("location_id")
+    if location_id:
+        game_state.discover_location(location_id)
+
+
+def _effect_improve_relationship(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    npc_id = effect_data.get("npc_id")
+    if npc_id:
+        relationships = game_state.npc_relationships
+        relationships[npc_id] = relationships.get(npc_id, 0) + effect_data.get("amount", 1)
+
+
+def _effect_gain_reputation(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    # Store reputation in temporary effects
+    temporary_effects = game_state.temporary_effects
+    temporary_effects["reputation"] = temporary_effects.get("reputation", 0) + effect_data.get("amount", 1)
+
+
+def _effect_change_weather(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    game_state.temporary_effects["weather"] = effect_data.get("weather", "clear")
+
+
+# temporary_effects key for each protection type, composed once per type
+_PROTECTION_KEYS: Dict[str, str] = {"general": "protection_general"}
+
+
+def _effect_protection(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    protection_type = effect_data.get("type", "general")
+    key = _PROTECTION_KEYS.get(protection_type)
+    if key is None:
+        key = _PROTECTION_KEYS[protection_type] = sys.intern(f"protection_{protection_type}")
+    game_state.temporary_effects[key] = effect_data.get("duration", 5)
 
 
-@dataclass
+def _effect_gain_title(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    game_state.temporary_effects["title"] = effect_data.get("title", "Adventurer")
+
+
+def _effect_establish_connection(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    connection_type = effect_data.get("type", "general")
+    target = effect_data.get("target", "unknown")
+    game_state.temporary_effects[f"connection_{connection_type}"] = target
+
+
+def _effect_trigger_event(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    event_id = effect_data.get("event_id")
+    if event_id:
+        game_state.world_events.append({
+            "id": event_id,
+            "triggered_by": action.id,
+            "timestamp": game_state.timestamp
+        })
+
+
+def _effect_advance_quest(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    quest_id = effect_data.get("quest_id")
+    if quest_id and player.has_quest(quest_id):
+        # Mark quest as advanced
+        game_state.temporary_effects.setdefault("advanced_quests", []).append(quest_id)
+
+
+def _effect_create_art(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    art_type = effect_data.get("type", "painting")
+    game_state.temporary_effects[f"created_art_{art_type}"] = effect_data.get("value", 10)
+
+
+def _effect_compose_song(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    song_type = effect_data.get("type", "ballad")
+    game_state.temporary_effects[f"composed_song_{song_type}"] = True
+
+
+def _effect_write_story(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    story_type = effect_data.get("type", "tale")
+    game_state.temporary_effects[f"written_story_{story_type}"] = True
+
+
+def _effect_in_combat(action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    # This would be handled in combat context
+    pass
+
+
+def _timed_effect(key: str, default_duration: int, action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    """Store the effect's duration under a fixed temporary_effects key; bound per effect with partial"""
+    game_state.temporary_effects[key] = effect_data.get("duration", default_duration)
+
+
+def _unlock_effect(data_key: str, effects_key: str, action: Action, player: Entity, game_state: 'GameState', effect_data: Dict[str, Any]):
+    """Append the effect's ID to a list in temporary_effects; bound per effect with partial"""
+    unlocked_id = effect_data.get(data_key)
+    if unlocked_id:
+        game_state.temporary_effects.setdefault(effects_key, []).append(unlocked_id)
+
+
+_EFFECT_HANDLERS = {
+    "heal": _effect_heal,
+    "restore_mana": _effect_restore_mana,
+    "add_gold": _effect_add_gold,
+    "add_experience": _effect_add_experience,
+    "add_item": _effect_add_item,
+    "learn_skill": _effect_learn_skill,
+    "move_to": _effect_move_to,
+    "teleport_to": _effect_move_to,
+    "unlock_location": _effect_unlock_location,
+    "improve_relationship": _effect_improve_relationship,
+    "gain_reputation": _effect_gain_reputation,
+    "unlock_dialogue": partial(_unlock_effect, "dialogue_id", "unlocked_dialogues"),
+    "change_weather": _effect_change_weather,
+    "create_light": partial(_timed_effect, "light_source", 10),
+    "open_secret_passage": partial(_unlock_effect, "passage_id", "open_passages"),
+    "invisibility": partial(_timed_effect, "invisible", 5),
+    "flight": partial(_timed_effect, "flying", 3),
+    "enhanced_senses": partial(_timed_effect, "enhanced_senses", 10),
+    "protection": _effect_protection,
+    "unlock_ability": partial(_unlock_effect, "ability_id", "unlocked_abilities"),
+    "gain_title": _effect_gain_title,
+    "establish_connection": _effect_establish_connection,
+    "trigger_event": _effect_trigger_event,
+    "reveal_secret": partial(_unlock_effect, "secret_id", "revealed_secrets"),
+    "advance_quest": _effect_advance_quest,
+    "create_art": _effect_create_art,
+    "compose_song": _effect_compose_song,
+    "write_story": _effect_write_story,
+    "damage_enemy": _effect_in_combat,
+    "buff_ally": _effect_in_combat,
+    "debuff_enemy": _effect_in_combat,
+}
+
+# Compiled Action.execute bodies, shared by every action with the same (cost keys, effect keys) shape
+_EXECUTE_FUNCTIONS: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], Any] = {}
+
+
+def _compile_execute(shape: Tuple[Tuple[str, ...], Tuple[str, ...]]):
+    """Generate an execute function that applies one action shape's costs and effects in straight-line code"""
+    cost_keys, effect_keys = shape
+    namespace = {}
+    lines = [
+        "def execute(action, player, game_state):",
+        "    reason = action._unmet_requirement(player, game_state)",
+        "    if reason is not None:",
+        "        return False, reason",
+    ]
+    if cost_keys:
+        lines.append("    cost = action.cost")
+    for i, resource in enumerate(cost_keys):
+        namespace[f"cost_{i}"] = _COST_HANDLERS[resource]
+        lines.append(f"    cost_{i}(player, cost[{resource!r}])")
+    if effect_keys:
+        lines.append("    effects = action.effects")
+    for i, effect_type in enumerate(effect_keys):
+        namespace[f"effect_{i}"] = _EFFECT_HANDLERS[effect_type]
+        lines.append(f"    effect_{i}(action, player, game_state, effects[{effect_type!r}])")
+    lines.append('    return True, f"Successfully performed {action.name}"')
+    exec("\n".join(lines) + "\n", namespace)
+    execute = namespace["execute"]
+    execute.__qualname__ = "Action.execute"
+    _EXECUTE_FUNCTIONS[shape] = execute
+    return execute
+
+
+@_cache_fields
+@_fast_pickle
+@dataclass(slots=True)
 class DataChange:
     """Represents a single change to game data"""
     timestamp: str
@@ -462,20 +703,23 @@ class DataChange:
     user_input: str
     reasoning: str
     change_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    _timestamp_dt: Optional[datetime] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Data types and field names repeat across the whole change history
+        self.data_type = sys.intern(self.data_type)
+        self.field_name = sys.intern(self.field_name)
+    
+    @property
+    def timestamp_dt(self) -> datetime:
+        """The timestamp as a datetime, parsed on first use"""
+        if self._timestamp_dt is None:
+            self._timestamp_dt = datetime.fromisoformat(self.timestamp)
+        return self._timestamp_dt
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
-        return {
-            "timestamp": self.timestamp,
-            "data_type": self.data_type,
-            "target_id": self.target_id,
-            "field_name": self.field_name,
-            "old_value": self.old_value,
-            "new_value": self.new_value,
-            "user_input": self.user_input,
-            "reasoning": self.reasoning,
-            "change_id": self.change_id
-        }
+        return {name: getattr(self, name) for name in self._FIELD_NAMES}
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'DataChange':
@@ -483,16 +727,43 @@ class DataChange:
         return cls(**data)
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class ChangeTracker:
-    """Tracks all changes made to game data"""
-    changes: List[DataChange] = field(default_factory=list)
+    """Tracks the most recent changes made to game data"""
+    # Oldest changes are dropped once this many are held
+    MAX_CHANGES: ClassVar[int] = 10_000
+    
+    changes: Deque[DataChange] = field(default_factory=deque)
+    # Changes grouped by data type, by target ID and by both, kept in step with changes
+    _by_type: Dict[str, List[DataChange]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _by_target: Dict[str, List[DataChange]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _by_pair: Dict[Tuple[str, str], List[DataChange]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # Changes not yet in the change log, and whether the log holds everything else in changes
+    _unsaved: List[DataChange] = field(default_factory=list, init=False, repr=False, compare=False)
+    _log_in_sync: bool = field(default=False, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.changes = deque(self.changes, maxlen=self.MAX_CHANGES)
+        for change in self.changes:
+            self._index_change(change)
+    
+    def _index_change(self, change: DataChange):
+        self._by_type.setdefault(change.data_type, []).append(change)
+        self._by_target.setdefault(change.target_id, []).append(change)
+        self._by_pair.setdefault((change.data_type, change.target_id), []).append(change)
+    
+    def _unindex_change(self, change: DataChange):
+        self._by_type[change.data_type].remove(change)
+        self._by_target[change.target_id].remove(change)
+        self._by_pair[(change.data_type, change.target_id)].remove(change)
     
     def add_change(self, data_type: str, target_id: str, field_name: str, 
                    old_value: Any, new_value: Any, user_input: str, reasoning: str):
         """Add a new change to the tracker"""
+        now = TICK_CLOCK.now()
         change = DataChange(
-            timestamp=datetime.now().isoformat(),
+            timestamp=now.isoformat(),
             data_type=data_type,
             target_id=target_id,
             field_name=field_name,
@@ -501,22 +772,40 @@ class ChangeTracker:
             user_input=user_input,
             reasoning=reasoning
         )
+        change._timestamp_dt = now
+        if len(self.changes) == self.MAX_CHANGES:
+            # The deque drops its oldest entry on append; drop it from the indexes too
+            self._unindex_change(self.changes[0])
         self.changes.append(change)
+        self._index_change(change)
+        self._unsaved.append(change)
         return change
     
+    def remove_change(self, change: DataChange):
+        """Remove a change from the tracker and its indexes"""
+        self.changes.remove(change)
+        self._unindex_change(change)
+        if change in self._unsaved:
+            self._unsaved.remove(change)
+        else:
+            # The change log already holds it; rewrite the log on the next save
+            self._log_in_sync = False
+    
     def get_changes_for(self, data_type: str = None, target_id: str = None) -> List[DataChange]:
         """Get changes filtered by data type and/or target ID"""
-        filtered = self.changes
+        # Copies, so callers can't reorder or trim the tracker's own indexes
+        if data_type and target_id:
+            return list(self._by_pair.get((data_type, target_id), ()))
         if data_type:
-            filtered = [c for c in filtered if c.data_type == data_type]
+            return list(self._by_type.get(data_type, ()))
         if target_id:
-            filtered = [c for c in filtered if c.target_id == target_id]
-        return filtered
+            return list(self._by_target.get(target_id, ()))
+        return list(self.changes)
     
     def get_recent_changes(self, hours: int = 24) -> List[DataChange]:
         """Get changes from the last N hours"""
         cutoff = datetime.now() - timedelta(hours=hours)
-        return [c for c in self.changes if datetime.fromisoformat(c.timestamp) > cutoff]
+        return [c for c in self.changes if c.timestamp_dt > cutoff]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
@@ -529,9 +818,48 @@ class ChangeTracker:
         """Create from dictionary"""
         changes = [DataChange.from_dict(change_data) for change_data in data.get("changes", [])]
         return cls(changes=changes)
+    
+    def save_new_changes(self, filename: str):
+        """Append changes not yet written to the change log, rewriting it if the history was edited"""
+        if self._log_in_sync:
+            pending = self._unsaved
+            if not pending:
+                return
+            mode = 'ab'
+        else:
+            pending = self.changes
+            mode = 'wb'
+        with open(filename, mode) as f:
+            f.write(b"".join(fastjson.dumps(change) + b"\n" for change in pending))
+        self._unsaved = []
+        self._log_in_sync = True
+    
+    @classmethod
+    def load_from_log(cls, filename: str) -> 'ChangeTracker':
+        """Rebuild the tracker from a change log written by save_new_changes, stopping at a line cut short by a crash"""
+        changes = []
+        torn = False
+        try:
+            with open(filename, 'rb') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            changes.append(DataChange.from_dict(fastjson.loads(line)))
+                        except (ValueError, TypeError):
+                            print(f"Ignoring unreadable entry in {filename} and anything after it")
+                            torn = True
+                            break
+        except FileNotFoundError:
+            return cls()
+        tracker = cls(changes=changes)
+        # A torn log, or one longer than the tracker keeps, is rewritten from what loaded on the next save
+        tracker._log_in_sync = not torn and len(changes) <= cls.MAX_CHANGES
+        return tracker
 
 
-@dataclass
+@_fast_pickle
+@dataclass(slots=True)
 class GameState:
     """Dynamic game state that changes during gameplay"""
     session_id: str
@@ -552,6 +880,47 @@ class GameState:
     temporary_effects: Dict[str, Any] = field(default_factory=dict)
     ai_generated_actions: Dict[str, 'Action'] = field(default_factory=dict)  # AI-created actions
     change_tracker: ChangeTracker = field(default_factory=ChangeTracker)  # Track all data modifications
+    # (filename, bytes) of the last full save, so unchanged state is not rewritten
+    _saved_content: Optional[Tuple[str, bytes]] = field(default=None, init=False, repr=False, compare=False)
+    # Set when add_ai_action/remove_ai_action journal to the delta log; cleared by the next full save
+    _dirty: bool = field(default=False, init=False, repr=False, compare=False)
+    # Set on a fresh state standing in for a save that failed to load, so nothing overwrites the files on disk
+    _read_only: bool = field(default=False, init=False, repr=False, compare=False)
+    # Set mirror of discovered_locations for O(1) membership tests; the list keeps discovery order
+    _discovered_set: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    # AI actions bucketed by their required location (None for actions usable anywhere), keyed by action ID
+    _ai_actions_by_location: Dict[Optional[str], Dict[str, 'Action']] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # Last get_available_ai_actions result and the player/world state it was computed for
+    _available_ai_actions: List['Action'] = field(default_factory=list, init=False, repr=False, compare=False)
+    _available_ai_actions_key: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _available_ai_actions_player: Optional['Entity'] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # NPC IDs repeat across relationships and conversation logs; share one string object per ID
+        self.npc_relationships = {sys.intern(k): v for k, v in self.npc_relationships.items()}
+        self.conversation_history = {
+            sys.intern(k): v[-CONVERSATION_HISTORY_LIMIT:] for k, v in self.conversation_history.items()
+        }
+        self._discovered_set = set(self.discovered_locations)
+        for action in self.ai_generated_actions.values():
+            self._index_ai_action(action)
+    
+    def discover_location(self, location_id: str) -> bool:
+        """Record a location as discovered, returning False if it already was"""
+        if location_id in self._discovered_set:
+            return False
+        self._discovered_set.add(location_id)
+        self.discovered_locations.append(location_id)
+        return True
+    
+    def record_conversation(self, npc_id: str, entry: str):
+        """Append to an NPC's conversation log, keeping only the most recent entries"""
+        history = self.conversation_history.get(npc_id)
+        if history is None:
+            history = self.conversation_history[sys.intern(npc_id)] = []
+        history.append(entry)
+        if len(history) > CONVERSATION_HISTORY_LIMIT:
+            del history[:-CONVERSATION_HISTORY_LIMIT]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
@@ -571,7 +940,7 @@ class GameState:
             "conversation_history": self.conversation_history,
             "conversation_states": {k: {
                 "npc_id": v.npc_id,
-                "conversation_history": [{"player_input": ex.player_input, "npc_response": ex.npc_response, "similarity_score": ex.similarity_score, "is_essential": ex.is_essential, "created_at": ex.created_at} for ex in v.conversation_history],
+                "conversation_history": [dict(zip(_EXCHANGE_FIELDS, _get_exchange_fields(ex))) for ex in v.conversation_history],
                 "essential_topics_created": v.essential_topics_created,
                 "relationship_level": v.relationship_level,
                 "max_questions_remaining": v.max_questions_remaining,
@@ -594,53 +963,98 @@ class GameState:
         
         # Convert AI actions back to Action objects
         for action_id, action_data in ai_actions_data.items():
-            game_state.ai_generated_actions[action_id] = Action.from_dict(action_data)
+            action = game_state.ai_generated_actions[action_id] = Action.from_dict(action_data)
+            game_state._index_ai_action(action)
         
         # Load change tracker
         game_state.change_tracker = ChangeTracker.from_dict(change_tracker_data)
         
         return game_state
     
-    def save_to_file(self, filename: str = "game_state.json"):
-        """Save state to file"""
-        with open(filename, 'w') as f:
-            json.dump(self.to_dict(), f, indent=2)
+    def save_to_file(self, filename: str = "game_state.json", changes_filename: str = "game_changes.log"):
+        """Save state to file, skipping the write when it would reproduce the last save"""
+        if self._read_only:
+            return
+        # The change history only grows, so new changes are appended to their own log
+        self.change_tracker.save_new_changes(changes_filename)
+        # Serialized straight from the dataclasses rather than building to_dict() first
+        content = fastjson.dumps({name: getattr(self, name) for name in _SAVED_STATE_FIELDS})
+        saved = (filename, content)
+        if saved != self._saved_content or not os.path.exists(filename):
+            with open(filename, 'wb') as f:
+                f.write(content)
+            self._saved_content = saved
+        self._dirty = False
+    
+    def flush(self, filename: str = "game_state.json", log_filename: str = "game_state.log"):
+        """Fold journaled AI action changes into a full save if there are any since the last one"""
+        if self._dirty:
+            self.compact(filename, log_filename)
+    
+    def append_delta(self, changes: Dict[str, Any], log_filename: str = "game_state.log"):
+        """Append changed top-level fields to the delta log as one JSON line"""
+        if self._read_only:
+            return
+        with open(log_filename, 'ab') as f:
+            f.write(fastjson.dumps(changes) + b"\n")
+    
+    def compact(self, filename: str = "game_state.json", log_filename: str = "game_state.log"):
+        """Write the full state to file and discard the delta log it supersedes"""
+        if self._read_only:
+            return
+        self.save_to_file(filename)
+        if os.path.exists(log_filename):
+            os.remove(log_filename)
+    
+    @staticmethod
+    def _replay_deltas(data: Dict[str, Any], log_filename: str):
+        """Apply logged field changes written since the last full save, stopping at a line cut short by a crash"""
+        try:
+            with open(log_filename, 'rb') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            delta = fastjson.loads(line)
+                        except ValueError:
+                            delta = None
+                        if not isinstance(delta, dict):
+                            # Only the last append can be torn; everything before it was written whole
+                            print(f"Ignoring unreadable entry in {log_filename} and anything after it")
+                            break
+                        action_changes = delta.pop(AI_ACTION_DELTA_KEY, None)
+                        if action_changes:
+                            actions = data.setdefault("ai_generated_actions", {})
+                            for action_id, action_data in action_changes.items():
+                                if action_data is None:
+                                    actions.pop(action_id, None)
+                                else:
+                                    actions[action_id] = action_data
+                        data.update(delta)
+        except FileNotFoundError:
+            pass
     
     @classmethod
-    def load_from_file(cls, filename: str = "game_state.json") -> Optional['GameState']:
-        """Load state from file"""
+    def load_from_file(cls, filename: str = "game_state.json", log_filename: str = "game_state.log",
+                       changes_filename: str = "game_changes.log") -> Optional['GameState']:
+        """Load state from file, replaying any delta log written after it; None if the save can't be read"""
         try:
-            with open(filename, 'r') as f:
-                content = f.read().strip()
-                if not content:  # Handle empty file
-                    return cls.create_new_game_state()
-                data = json.loads(content)
-            
-            # Create GameState object from loaded data
-            game_state = cls(
-                session_id=data.get("session_id", str(uuid.uuid4())),
-                timestamp=data.get("timestamp", datetime.now().isoformat()),
-                player_location=data.get("player_location", "tavern"),
-                player_health=data.get("player_health", 100),
-                player_mana=data.get("player_mana", 50),
-                player_gold=data.get("player_gold", 100),
-                player_level=data.get("player_level", 1),
-                player_experience=data.get("player_experience", 0),
-                active_quests=data.get("active_quests", []),
-                completed_quests=data.get("completed_quests", []),
-                discovered_locations=data.get("discovered_locations", ["tavern"]),
-                npc_relationships=data.get("npc_relationships", {}),
-                conversation_history=data.get("conversation_history", {}),
-                conversation_states={},  # Will be populated from data
-                world_events=data.get("world_events", []),
-                temporary_effects=data.get("temporary_effects", {}),
-                ai_generated_actions={},
-                change_tracker=ChangeTracker.from_dict(data.get("change_tracker", {}))
-            )
+            data = {}
+            try:
+                with open(filename, 'rb') as f:
+                    content = f.read().strip()
+                if content:  # Handle empty file
+                    data = fastjson.loads(content)
+            except FileNotFoundError:
+                # Until the first full save, everything since the new game is in the delta log
+                pass
+            cls._replay_deltas(data, log_filename)
+            if not data:
+                return cls.create_new_game_state()
             
             # Load conversation states
-            conversation_states_data = data.get("conversation_states", {})
-            for npc_id, state_data in conversation_states_data.items():
+            conversation_states = {}
+            for npc_id, state_data in data.get("conversation_states", {}).items():
                 # Convert conversation history back to DynamicExchange objects
                 conversation_history = []
                 for ex_data in state_data.get("conversation_history", []):
@@ -653,7 +1067,7 @@ class GameState:
                     )
                     conversation_history.append(exchange)
                 
-                conversation_state = ConversationState(
+                conversation_states[npc_id] = ConversationState(
                     npc_id=state_data["npc_id"],
                     conversation_history=conversation_history,
                     essential_topics_created=state_data.get("essential_topics_created", []),
@@ -661,41 +1075,108 @@ class GameState:
                     max_questions_remaining=state_data.get("max_questions_remaining", 10),
                     last_interaction=state_data.get("last_interaction", datetime.now().isoformat())
                 )
-                game_state.conversation_states[npc_id] = conversation_state
+            data["conversation_states"] = conversation_states
             
             # Load AI-generated actions
-            ai_actions_data = data.get("ai_generated_actions", {})
-            for action_id, action_data in ai_actions_data.items():
-                game_state.ai_generated_actions[action_id] = Action(**action_data)
+            data["ai_generated_actions"] = {
+                action_id: Action(**action_data)
+                for action_id, action_data in data.get("ai_generated_actions", {}).items()
+            }
+            
+            # Saves written before the change log existed keep their history inline
+            data["change_tracker"] = (
+                ChangeTracker.from_dict(data["change_tracker"]) if "change_tracker" in data
+                else ChangeTracker.load_from_log(changes_filename)
+            )
             
-            return game_state
+            return cls._fast_restore(data)
             
         except FileNotFoundError:
             # Create new game state if file doesn't exist
             return cls.create_new_game_state()
         except Exception as e:
             print(f"Error loading game state: {e}")
-            return cls.create_new_game_state()
+            return None
+    
+    def save_snapshot(self, filename: str = "game_state.pkl"):
+        """Pickle the whole state for fast local autosaves; JSON via save_to_file stays the portable format"""
+        with open(filename, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    @classmethod
+    def load_snapshot(cls, filename: str = "game_state.pkl") -> Optional['GameState']:
+        """Load a state written by save_snapshot, or None if there is none"""
+        try:
+            with open(filename, 'rb') as f:
+                game_state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        # Save bookkeeping belongs to the process that pickled it
+        game_state._saved_content = None
+        game_state._dirty = False
+        game_state.change_tracker._log_in_sync = False
+        return game_state
+    
+    @classmethod
+    def _fast_restore(cls, data: Dict[str, Any]) -> 'GameState':
+        """Install loaded fields directly on a new instance, skipping __init__; missing fields use _RESTORE_DEFAULTS"""
+        game_state = cls.__new__(cls)
+        for name, default in _RESTORE_DEFAULTS.items():
+            setattr(game_state, name, data[name] if name in data else default())
+        game_state.__post_init__()
+        return game_state
     
     def add_ai_action(self, action: 'Action'):
         """Add an AI-generated action to the game state"""
+        replaced = self.ai_generated_actions.get(action.id)
+        if replaced is not None:
+            self._unindex_ai_action(replaced)
         self.ai_generated_actions[action.id] = action
-        self.save_to_file()
+        self._index_ai_action(action)
+        # Journal just this action; the full state is rewritten only when the log is compacted
+        self.append_delta({AI_ACTION_DELTA_KEY: {action.id: action.to_dict()}})
+        self._dirty = True
     
     def remove_ai_action(self, action_id: str):
         """Remove an AI-generated action"""
         if action_id in self.ai_generated_actions:
-            del self.ai_generated_actions[action_id]
-            self.save_to_file()
+            self._unindex_ai_action(self.ai_generated_actions.pop(action_id))
+            self.append_delta({AI_ACTION_DELTA_KEY: {action_id: None}})
+            self._dirty = True
+    
+    def _index_ai_action(self, action: 'Action'):
+        location_id = action._required_location
+        self._ai_actions_by_location.setdefault(location_id, {})[action.id] = action
+        self._available_ai_actions_key = None
+    
+    def _unindex_ai_action(self, action: 'Action'):
+        bucket = self._ai_actions_by_location.get(action._required_location)
+        if bucket:
+            bucket.pop(action.id, None)
+        self._available_ai_actions_key = None
     
     def get_available_ai_actions(self, player: 'Entity') -> List['Action']:
         """Get all AI-generated actions that the player can currently perform"""
+        # Everything can_perform reads; the player's version covers their items and skills
+        stats = player.stats
+        key = (self.player_location, stats.level, stats.mana, stats.health, player.gold, player._version)
+        if key == self._available_ai_actions_key and player is self._available_ai_actions_player:
+            return list(self._available_ai_actions)
+        
+        # Only actions usable anywhere or tied to the current location can pass the location check
         available_actions = []
-        for action in self.ai_generated_actions.values():
-            can_perform, _ = action.can_perform(player, self)
-            if can_perform:
-                available_actions.append(action)
-        return available_actions
+        for location_id in (None, self.player_location):
+            for action in self._ai_actions_by_location.get(location_id, {}).values():
+                # Level is a single slot comparison; skip the full check for actions gated above it
+                if action._required_level > stats.level:
+                    continue
+                can_perform, _ = action.can_perform(player, self)
+                if can_perform:
+                    available_actions.append(action)
+        self._available_ai_actions = available_actions
+        self._available_ai_actions_key = key
+        self._available_ai_actions_player = player
+        return list(available_actions)
     
     @classmethod
     def create_new_game_state(cls) -> 'GameState':
@@ -720,3 +1201,29 @@ class GameState:
             ai_generated_actions={},
             change_tracker=ChangeTracker()
         )
+
+
+# Fallbacks GameState._fast_restore uses for fields missing from a save; the rest use their field defaults
+_RESTORE_DEFAULTS = {
+    "session_id": lambda: str(uuid.uuid4()),
+    "timestamp": lambda: datetime.now().isoformat(),
+    "player_location": lambda: "tavern",
+    "player_health": lambda: 100,
+    "player_mana": lambda: 50,
+    "player_gold": lambda: 100,
+    "player_level": lambda: 1,
+    "player_experience": lambda: 0,
+    "discovered_locations": lambda: ["tavern"],
+}
+for _field in fields(GameState):
+    if _field.name not in _RESTORE_DEFAULTS:
+        _RESTORE_DEFAULTS[_field.name] = (
+            _field.default_factory if _field.default_factory is not MISSING
+            else (lambda value=_field.default: value)
+        )
+del _field
+
+# GameState fields written to the state file; the change history goes to its own log
+_SAVED_STATE_FIELDS = tuple(
+    f.name for f in fields(GameState) if not f.name.startswith("_") and f.name != "change_tracker"
+)
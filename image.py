@@ -2,7 +2,7 @@ import os
 import requests
 import base64
 from typing import Optional, Dict, Any
-import json
+import fastjson
 from datetime import datetime
 
 # Load environment variables from .env file
@@ -23,6 +23,8 @@ class ImageGenerator:
             "Content-Type": "application/json"
         }
         self.image_cache: Dict[str, str] = {}
+        # Reuse one pooled connection to the API instead of a new TLS handshake per image
+        self.session = requests.Session()
     
     def set_api_key(self, api_key: str):
         """Set the API key for image generation"""
@@ -45,7 +47,7 @@ class ImageGenerator:
                 "n": 1
             }
             
-            response = requests.post(self.base_url, headers=self.headers, json=payload)
+            response = self.session.post(self.base_url, headers=self.headers, json=payload)
             response.raise_for_status()
             
             data = response.json()
@@ -120,8 +122,8 @@ class ImageGenerator:
     def export_image_log(self, filename: str = "image_log.json"):
         """Export the image cache to a JSON file"""
         try:
-            with open(filename, 'w') as f:
-                json.dump(self.image_cache, f, indent=2)
+            with open(filename, 'wb') as f:
+                f.write(fastjson.dumps(self.image_cache, indent=True))
             print(f"Image log exported to {filename}")
         except Exception as e:
             print(f"Failed to export image log: {e}")
@@ -169,11 +171,12 @@ def setup_image_generation():
         return False
 
 
-def generate_game_images(game_state: Dict[str, Any], event_type: str, **kwargs):
-    """Generate appropriate images based on game events"""
+def generate_game_images(game_state: Dict[str, Any], event_type: str, **kwargs) -> Optional[str]:
+    """Generate appropriate images based on game events, returning the new image URL if one was made"""
     if not image_gen.api_key:
-        return
+        return None
     
+    url = None
     try:
         if event_type == "character_creation":
             # Generate character portrait
@@ -250,6 +253,9 @@ def generate_game_images(game_state: Dict[str, Any], event_type: str, **kwargs):
     
     except Exception as e:
         print(f"Image generation failed for {event_type}: {e}")
+        return None
+    
+    return url
 
 
 def display_image_url(url: str, description: str):
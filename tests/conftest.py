@@ -0,0 +1,17 @@
+import os
+import shutil
+
+import pytest
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _play_outside_repo(tmp_path_factory):
+    """Run every test from a scratch copy of the game data, so saves and the data cache never land in the repo"""
+    workdir = tmp_path_factory.mktemp("game")
+    shutil.copytree(DATA_DIR, workdir / "data", ignore=shutil.ignore_patterns(".data_cache.pkl"))
+    previous = os.getcwd()
+    os.chdir(workdir)
+    yield
+    os.chdir(previous)
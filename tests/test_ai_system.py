@@ -3,6 +3,7 @@
 Test script for the new AI system with modern OpenAI client and tool calling.
 """
 
+import json
 import os
 from ai_actions import ai_handler
 from ai_prompts import (
@@ -128,5 +129,39 @@ def test_ai_system():
     print("\n💡 To test with actual API calls, set your OPENAI_API_KEY environment variable")
     print("   and run the game with: python engine.py")
 
+def _counting_client(arguments):
+    """Stand-in OpenAI client that answers every call with the same tool arguments and counts the calls"""
+    from types import SimpleNamespace
+    calls = []
+    tool_call = SimpleNamespace(function=SimpleNamespace(arguments=json.dumps(arguments)))
+    response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(tool_calls=[tool_call]))])
+    create = lambda **kwargs: calls.append(kwargs) or response
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))), calls
+
+def test_repeated_decisions_skip_the_api(monkeypatch):
+    """The same input in the same state is answered from the cache; the least recently used entry goes first"""
+    import ai_actions
+    handler = ai_actions.AIActionHandler()
+    handler.client, calls = _counting_client({"action_type": "immediate", "data_type": "none", "reasoning": "ok"})
+    monkeypatch.setattr(ai_actions, "AI_DECISION_CACHE_SIZE", 2)
+    tavern = {"player_location": "tavern", "player_gold": 100}
+    
+    first = handler.determine_data_action("dance a jig", tavern)
+    assert handler.determine_data_action("  Dance a JIG ", tavern) == first
+    assert len(calls) == 1
+    
+    # A different game state is a different question
+    handler.determine_data_action("dance a jig", {"player_location": "forest", "player_gold": 100})
+    assert len(calls) == 2
+    
+    # Touching the tavern entry makes the forest one the oldest, so it is evicted by the next decision
+    handler.determine_data_action("dance a jig", tavern)
+    handler.determine_data_action("sing", tavern)
+    assert len(calls) == 3
+    handler.determine_data_action("dance a jig", tavern)
+    assert len(calls) == 3
+    handler.determine_data_action("dance a jig", {"player_location": "forest", "player_gold": 100})
+    assert len(calls) == 4
+
 if __name__ == "__main__":
     test_ai_system() 
\ No newline at end of file
@@ -7,7 +7,7 @@ import os
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from engine import GameEngine
+from engine import GameEngine, _COMMAND_TYPOS
 
 def test_interactive():
     """Test the game with simulated user input."""
@@ -87,5 +87,44 @@ def test_interactive():
     
     print("\n🎉 Interactive test completed!")
 
+def test_free_form_verbs_are_not_typos():
+    """Real verbs close to a command go to the AI; only swapped letters get a suggestion"""
+    for verb in ["stare", "user", "talks", "sue", "walk", "take", "moves"]:
+        assert verb not in _COMMAND_TYPOS, verb
+    assert _COMMAND_TYPOS["stauts"] == "status"
+    assert _COMMAND_TYPOS["invnetory"] == "inventory"
+    assert _COMMAND_TYPOS["tlak"] == "talk"
+
+def test_main_loop_dispatches_commands_and_typos(tmp_path, monkeypatch, capsys):
+    """Table commands run their engine method, swapped-letter typos get a hint, anything else goes to the AI"""
+    import io
+    import shutil
+    import engine
+    monkeypatch.chdir(tmp_path)
+    shutil.copytree(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"), "data",
+                    ignore=shutil.ignore_patterns(".data_cache.pkl"))
+    monkeypatch.setattr(engine.atexit, "register", lambda *args: None)
+    freeform = []
+    monkeypatch.setattr(engine, "_handle_freeform_input", lambda game, user_input, cmd: freeform.append(user_input))
+    dispatched = []
+    monkeypatch.setitem(engine.SINGLE_ARG_COMMANDS, "travel", lambda game, location_id: dispatched.append(location_id))
+    monkeypatch.setitem(engine.NO_ARG_COMMANDS, "status", lambda game: dispatched.append("status"))
+    monkeypatch.setattr(sys, "stdin", io.StringIO("stauts\nSTATUS\ntravel Forest\ndance a jig\nquit\n"))
+    
+    engine.main()
+    out = capsys.readouterr().out
+    assert "Did you mean 'status'?" in out
+    assert dispatched == ["status", "forest"]
+    assert freeform == ["dance a jig"]
+    assert "Thanks for playing!" in out
+
+def test_piped_input_still_shows_prompt(monkeypatch, capsys):
+    """Commands read from a pipe are prompted for like typed ones"""
+    import io
+    from engine import _read_command
+    monkeypatch.setattr(sys, "stdin", io.StringIO("look\n"))
+    assert _read_command().strip() == "look"
+    assert capsys.readouterr().out == "\n> "
+
 if __name__ == "__main__":
     test_interactive() 
\ No newline at end of file
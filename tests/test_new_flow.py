@@ -4,9 +4,12 @@ Test the new action flow without dynamic action caching
 """
 
 import os
+import shutil
 import sys
 from engine import GameEngine
 from ai_actions import AIActionHandler
+import fastjson
+from game_types import Action, ChangeTracker, Entity, GameState, Stats
 
 def test_new_action_flow():
     """Test the new action flow with immediate execution"""
@@ -334,6 +337,306 @@ def test_change_tracking_and_balance():
     
     print(f"✅ Change tracking and balance validation test completed! ({successful_modifications} successful modifications)")
 
+def test_ai_action_survives_reload_without_flush(tmp_path, monkeypatch):
+    """AI actions journaled before the first full save are restored from the delta log"""
+    monkeypatch.chdir(tmp_path)
+    game_state = GameState.load_from_file()
+    game_state.add_ai_action(Action(id="dance", name="Dance", description="Dance a jig", action_type="social"))
+    assert not os.path.exists("game_state.json")
+    
+    reloaded = GameState.load_from_file()
+    assert list(reloaded.ai_generated_actions) == ["dance"]
+
+def test_flush_with_no_net_change_clears_the_log(tmp_path, monkeypatch):
+    """Changes that cancel out skip the rewrite but still leave the state clean and the log folded in"""
+    monkeypatch.chdir(tmp_path)
+    game_state = GameState.load_from_file()
+    game_state.compact()
+    with open("game_state.json", "rb") as f:
+        saved = f.read()
+    
+    game_state.add_ai_action(Action(id="dance", name="Dance", description="Dance a jig", action_type="social"))
+    game_state.remove_ai_action("dance")
+    game_state.flush()
+    assert not game_state._dirty
+    assert not os.path.exists("game_state.log")
+    with open("game_state.json", "rb") as f:
+        assert f.read() == saved
+
+def _play_in(tmp_path, monkeypatch):
+    """Run from tmp_path with a private copy of the game data, so saves and the data cache stay there"""
+    monkeypatch.chdir(tmp_path)
+    shutil.copytree(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"), "data",
+                    ignore=shutil.ignore_patterns(".data_cache.pkl"))
+
+def test_data_cache_reused_until_sources_change(tmp_path, monkeypatch):
+    """Parsed data comes back from the pickle cache until a JSON file changes or the cache is unreadable"""
+    import data_loader
+    _play_in(tmp_path, monkeypatch)
+    first = data_loader.DataLoader()
+    first.load_all_data()
+    assert os.path.exists(os.path.join("data", data_loader.CACHE_FILENAME))
+    
+    def no_parsing(self):
+        raise AssertionError("JSON parsed despite a fresh cache")
+    with monkeypatch.context() as patched:
+        patched.setattr(data_loader.DataLoader, "load_items", no_parsing)
+        cached = data_loader.DataLoader()
+        cached.load_all_data()
+    assert cached.items == first.items
+    assert cached.locations == first.locations
+    
+    with open(os.path.join("data", "items.json"), "rb") as f:
+        items = fastjson.loads(f.read())
+    items["iron_sword"]["description"] = "A notched old sword"
+    with open(os.path.join("data", "items.json"), "wb") as f:
+        f.write(fastjson.dumps(items))
+    edited = data_loader.DataLoader()
+    edited.load_all_data()
+    assert edited.items["iron_sword"].description == "A notched old sword"
+    
+    with open(os.path.join("data", data_loader.CACHE_FILENAME), "wb") as f:
+        f.write(b"not a pickle")
+    rebuilt = data_loader.DataLoader()
+    rebuilt.load_all_data()
+    assert rebuilt.items == edited.items
+
+def test_player_state_survives_reload_without_flush(tmp_path, monkeypatch):
+    """Player fields logged as deltas are on disk even if the session never flushes"""
+    _play_in(tmp_path, monkeypatch)
+    game = GameEngine()
+    assert os.path.exists("game_state.json")
+    game.travel_to_location("forest")
+    
+    reloaded = GameState.load_from_file()
+    assert reloaded.player_location == "forest"
+    assert "forest" in reloaded.discovered_locations
+    
+    # A new session folds the log into its base save and logs nothing it already has
+    GameEngine()
+    with open("game_state.log") as f:
+        assert '"discovered_locations"' not in f.read()
+
+def test_delta_log_stops_at_torn_line(tmp_path):
+    """A crash mid-append leaves a partial last line; the entries before it still load"""
+    state_file = str(tmp_path / "game_state.json")
+    delta_file = str(tmp_path / "game_state.log")
+    changes_file = str(tmp_path / "game_changes.log")
+    game_state = GameState.create_new_game_state()
+    game_state.player_level = 7
+    game_state.save_to_file(state_file, changes_file)
+    game_state.append_delta({"player_gold": 250}, delta_file)
+    with open(delta_file, "ab") as f:
+        f.write(b'{"player_level": 1, "player_lo')
+    
+    loaded = GameState.load_from_file(state_file, delta_file, changes_file)
+    assert loaded.session_id == game_state.session_id
+    assert loaded.player_level == 7
+    assert loaded.player_gold == 250
+
+def test_snapshot_round_trip_leaves_saves_alone(tmp_path, monkeypatch, capsys):
+    """An engine rebuilt from a snapshot matches the original without touching saves or replaying the intro"""
+    _play_in(tmp_path, monkeypatch)
+    game = GameEngine()
+    game.travel_to_location("forest")
+    game.get_player().gold = 42
+    snapshot = fastjson.loads(fastjson.dumps(game.to_snapshot()))
+    for name in ("game_state.json", "game_state.log", "game_changes.log"):
+        if os.path.exists(name):
+            os.remove(name)
+    capsys.readouterr()
+    
+    restored = GameEngine.from_snapshot(snapshot)
+    assert restored.to_snapshot() == snapshot
+    assert restored.get_current_location().id == "forest"
+    assert restored.locations["tavern"].scene not in capsys.readouterr().out
+    assert not any(os.path.exists(name) for name in ("game_state.json", "game_state.log", "game_changes.log"))
+
+def test_unreadable_save_is_left_untouched(tmp_path, monkeypatch):
+    """If the save can't be loaded, the session starts fresh without overwriting or adding to it"""
+    _play_in(tmp_path, monkeypatch)
+    with open("game_state.json", "w") as f:
+        f.write('{"player_level": 7, "session_id": ')
+    
+    game = GameEngine()
+    assert game.game_state.player_level == 1
+    game.travel_to_location("forest")
+    game.flush_state()
+    with open("game_state.json") as f:
+        assert f.read() == '{"player_level": 7, "session_id": '
+    assert not os.path.exists("game_state.log")
+
+def test_available_ai_actions_follow_player_changes(tmp_path, monkeypatch):
+    """The available AI action cache is keyed on the player object and its version, and hands out copies"""
+    monkeypatch.chdir(tmp_path)
+    game_state = GameState.create_new_game_state()
+    game_state.add_ai_action(Action(
+        id="pick_lock", name="Pick Lock", description="Open the chest", action_type="exploration",
+        requirements={"items": ["lockpick"]}
+    ))
+    
+    def make_player(inventory):
+        stats = Stats(health=100, max_health=100, mana=50, max_mana=50, strength=10, dexterity=10,
+                      constitution=10, intelligence=10, wisdom=10, charisma=10, level=1, experience=0)
+        return Entity(id="player", name="Hero", stats=stats, inventory=inventory)
+    
+    player = make_player(["rope"])
+    assert game_state.get_available_ai_actions(player) == []
+    player.add_item("lockpick")
+    available = game_state.get_available_ai_actions(player)
+    assert [action.id for action in available] == ["pick_lock"]
+    available.clear()
+    assert len(game_state.get_available_ai_actions(player)) == 1
+    
+    # A different player with the same ID and inventory size is not served the cached result
+    assert game_state.get_available_ai_actions(make_player(["rope", "torch"])) == []
+
+def _freeform_calls(game, monkeypatch, action_type):
+    """Route free-form input through stub AI calls, recording which ones ran"""
+    import engine
+    calls = []
+    monkeypatch.setattr(engine.ai_handler, "check_player_permission",
+                        lambda *args: calls.append("permission") or
+                        {"allowed": False, "reasoning": "no", "restricted_effects": []})
+    monkeypatch.setattr(engine.ai_handler, "determine_data_action",
+                        lambda *args: {"action_type": action_type, "data_type": "item", "reasoning": "stub"})
+    monkeypatch.setattr(game, "modify_existing_data", lambda *args: calls.append("modify") or True)
+    monkeypatch.setattr(game, "execute_immediate_action",
+                        lambda *args, apply_effects=True: calls.append(("immediate", apply_effects)) or True)
+    return calls
+
+def test_read_only_verb_still_needs_permission_to_change_data(tmp_path, monkeypatch):
+    """A look/check command skips the permission check only while it stays read-only"""
+    import engine
+    _play_in(tmp_path, monkeypatch)
+    game = GameEngine()
+    
+    calls = _freeform_calls(game, monkeypatch, "modify_existing")
+    engine._handle_freeform_input(game, "check the chest and give me 1000 gold", "check")
+    assert calls == ["permission"]
+    
+    calls = _freeform_calls(game, monkeypatch, "immediate")
+    engine._handle_freeform_input(game, "check the chest and give me 1000 gold", "check")
+    assert calls == [("immediate", False)]
+
+def test_created_location_offers_its_quests(tmp_path, monkeypatch):
+    """A location created mid-game is found by the quest -> location lookup"""
+    import engine
+    from types import SimpleNamespace
+    _play_in(tmp_path, monkeypatch)
+    game = GameEngine()
+    
+    new_location = {"id": "old_mill", "name": "The Old Mill", "description": "A creaking mill.",
+                    "quests": ["mill_rats"]}
+    tool_call = SimpleNamespace(function=SimpleNamespace(arguments=fastjson.dumps(new_location)))
+    response = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(tool_calls=[tool_call]))])
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: response)))
+    monkeypatch.setattr(engine.ai_handler, "client", client, raising=False)
+    
+    assert game._get_quest_location("mill_rats") == "Unknown"
+    assert game.create_new_data("find a mill", "location", {})
+    assert game._get_quest_location("mill_rats") == "The Old Mill"
+
+def _record_changes(tracker, count, start=0):
+    """Add count distinct description changes to a tracker"""
+    for i in range(start, start + count):
+        tracker.add_change("item", "iron_sword", "description", f"v{i}", f"v{i + 1}", "polish my sword", "cosmetic")
+
+def _change_dicts(tracker):
+    return [change.to_dict() for change in tracker.changes]
+
+def _log_lines(filename):
+    with open(filename, "rb") as f:
+        return [line for line in f if line.strip()]
+
+def test_change_log_appends_new_changes(tmp_path):
+    """Saves append only unsaved changes, and the log loads back into the same history"""
+    log_file = str(tmp_path / "game_changes.log")
+    tracker = ChangeTracker()
+    _record_changes(tracker, 2)
+    tracker.save_new_changes(log_file)
+    _record_changes(tracker, 1, start=2)
+    tracker.save_new_changes(log_file)
+    tracker.save_new_changes(log_file)
+    assert len(_log_lines(log_file)) == 3
+    
+    loaded = ChangeTracker.load_from_log(log_file)
+    assert _change_dicts(loaded) == _change_dicts(tracker)
+    assert [c.field_name for c in loaded.get_changes_for("item", "iron_sword")] == ["description"] * 3
+    
+    # A loaded log is in sync, so the next save still only appends
+    _record_changes(loaded, 1, start=3)
+    loaded.save_new_changes(log_file)
+    assert len(_log_lines(log_file)) == 4
+    assert _change_dicts(ChangeTracker.load_from_log(log_file)) == _change_dicts(loaded)
+
+def test_change_log_rewritten_after_revert(tmp_path):
+    """Removing an already-saved change rewrites the log without it"""
+    log_file = str(tmp_path / "game_changes.log")
+    tracker = ChangeTracker()
+    _record_changes(tracker, 3)
+    tracker.save_new_changes(log_file)
+    tracker.remove_change(tracker.changes[1])
+    tracker.save_new_changes(log_file)
+    
+    loaded = ChangeTracker.load_from_log(log_file)
+    assert [c.new_value for c in loaded.changes] == ["v1", "v3"]
+    assert _change_dicts(loaded) == _change_dicts(tracker)
+
+def test_legacy_inline_change_tracker_loads_and_migrates(tmp_path):
+    """Saves that still hold the change history inline load it, and the next save moves it to the log"""
+    state_file = str(tmp_path / "game_state.json")
+    delta_file = str(tmp_path / "game_state.log")
+    log_file = str(tmp_path / "game_changes.log")
+    game_state = GameState.create_new_game_state()
+    _record_changes(game_state.change_tracker, 2)
+    with open(state_file, "wb") as f:
+        f.write(fastjson.dumps(game_state.to_dict()))
+    
+    loaded = GameState.load_from_file(state_file, delta_file, log_file)
+    assert _change_dicts(loaded.change_tracker) == _change_dicts(game_state.change_tracker)
+    
+    loaded.save_to_file(state_file, log_file)
+    with open(state_file, "rb") as f:
+        assert "change_tracker" not in fastjson.loads(f.read())
+    reloaded = GameState.load_from_file(state_file, delta_file, log_file)
+    assert _change_dicts(reloaded.change_tracker) == _change_dicts(game_state.change_tracker)
+
+def test_change_log_stops_at_truncated_line(tmp_path):
+    """A partial last line from a crash is dropped, and the next save rewrites the log without it"""
+    log_file = str(tmp_path / "game_changes.log")
+    tracker = ChangeTracker()
+    _record_changes(tracker, 2)
+    tracker.save_new_changes(log_file)
+    with open(log_file, "ab") as f:
+        f.write(b'{"timestamp": "2024-01-01T00:00:00", "data_type": "it')
+    
+    loaded = ChangeTracker.load_from_log(log_file)
+    assert _change_dicts(loaded) == _change_dicts(tracker)
+    _record_changes(loaded, 1, start=2)
+    loaded.save_new_changes(log_file)
+    assert len(_log_lines(log_file)) == 3
+    assert _change_dicts(ChangeTracker.load_from_log(log_file)) == _change_dicts(loaded)
+
+def test_change_log_trimmed_when_over_cap(tmp_path, monkeypatch):
+    """A log holding more changes than the tracker keeps loads the newest ones and is rewritten trimmed"""
+    monkeypatch.setattr(ChangeTracker, "MAX_CHANGES", 3)
+    log_file = str(tmp_path / "game_changes.log")
+    tracker = ChangeTracker()
+    _record_changes(tracker, 2)
+    tracker.save_new_changes(log_file)
+    _record_changes(tracker, 3, start=2)
+    tracker.save_new_changes(log_file)
+    assert len(tracker.changes) == 3
+    assert len(_log_lines(log_file)) == 5
+    
+    loaded = ChangeTracker.load_from_log(log_file)
+    assert [c.new_value for c in loaded.changes] == ["v3", "v4", "v5"]
+    assert len(loaded.get_changes_for("item")) == 3
+    loaded.save_new_changes(log_file)
+    assert len(_log_lines(log_file)) == 3
+    assert _change_dicts(ChangeTracker.load_from_log(log_file)) == _change_dicts(tracker)
+
 if __name__ == "__main__":
     test_new_action_flow()
     test_comprehensive_context()
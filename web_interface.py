@@ -2,6 +2,7 @@ from flask import Flask, render_template, request, jsonify, redirect, url_for
 from game_types import *
 from engine import GameEngine
 from image import ImageGenerator, setup_image_generation, generate_game_images
+import atexit
 import json
 import os
 from datetime import datetime
@@ -14,6 +15,9 @@ game = None
 image_gen = ImageGenerator()
 
 class WebGameEngine(GameEngine):
+    # The overrides below read image_gen's cache as soon as an event returns, so generate inline
+    background_images = False
+    
     def __init__(self):
         super().__init__()
         self.game_log = []
@@ -75,6 +79,8 @@ def initialize_game():
     """Initialize the game with web interface"""
     global game
     game = WebGameEngine()
+    # Mutations between periodic saves are only in the delta log; write them out when the server stops
+    atexit.register(game.flush_state)
     
     # Setup image generation
     if os.path.exists('.env'):
@@ -139,6 +145,7 @@ def perform_action():
     if not game:
         return jsonify({'error': 'Game not initialized'})
     
+    TICK_CLOCK.tick()
     data = request.get_json()
     action = data.get('action')
     
@@ -171,7 +178,7 @@ def perform_action():
             return jsonify({'success': False, 'message': 'Cannot start quest'})
     
     elif action == 'combat':
-        if game.simulate_combat():
+        if game.simulate_combat(verbose=False):
             return jsonify({'success': True, 'message': 'Combat completed successfully'})
         else:
             return jsonify({'success': False, 'message': 'Combat failed'})